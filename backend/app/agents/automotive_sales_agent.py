@@ -11,10 +11,9 @@ Each specialist is an independent agent with its own LLM calls and responsibilit
 """
 from typing import Dict, Any, List, TypedDict, Optional, Literal
 from langgraph.graph import StateGraph, END
-from app.agents.base_agent import BaseAgent
+from app.agents.base_agent import BaseAgent, get_llm_service
 from app.data.mock_data import MockDataStore
 from app.tools.automotive_tools import AutomotiveTools
-from app.services.llm_service import LLMService
 import asyncio
 import re
 
@@ -53,7 +52,7 @@ class IntentAnalyzerAgent:
     
     def __init__(self):
         self.name = "Intent Analyzer"
-        self.llm_service = LLMService()
+        self.llm_service = get_llm_service()
     
     def get_system_prompt(self) -> str:
         return """You are an intent analysis specialist for an automotive dealership.
@@ -125,7 +124,7 @@ class InventorySpecialistAgent:
     def __init__(self):
         self.name = "Inventory Specialist"
         self.tools = AutomotiveTools()
-        self.llm_service = LLMService()
+        self.llm_service = get_llm_service()
     
     def get_system_prompt(self) -> str:
         return """You are a vehicle inventory specialist at an automotive dealership.
@@ -205,7 +204,7 @@ class FinanceSpecialistAgent:
     def __init__(self):
         self.name = "Finance Specialist"
         self.tools = AutomotiveTools()
-        self.llm_service = LLMService()
+        self.llm_service = get_llm_service()
     
     def get_system_prompt(self) -> str:
         return """You are a finance specialist at an automotive dealership.
@@ -266,7 +265,7 @@ class ServiceAdvisorAgent:
     def __init__(self):
         self.name = "Service Advisor"
         self.tools = AutomotiveTools()
-        self.llm_service = LLMService()
+        self.llm_service = get_llm_service()
     
     def get_system_prompt(self) -> str:
         return """You are a service advisor at an automotive dealership.
@@ -326,7 +325,7 @@ class TestDriveCoordinatorAgent:
     def __init__(self):
         self.name = "Test Drive Coordinator"
         self.tools = AutomotiveTools()
-        self.llm_service = LLMService()
+        self.llm_service = get_llm_service()
     
     def get_system_prompt(self) -> str:
         return """You are a test drive coordinator at an automotive dealership.
@@ -418,11 +417,10 @@ Your role is to:
 3. Ensure a smooth, cohesive customer experience"""
 
     def _get_inventory_context(self) -> str:
-        vehicles = MockDataStore.get_available_vehicles()
-        lines = []
-        for v in vehicles:
-            lines.append(f"- {v['year']} {v['brand']} {v['model']} ({v['color']}) - ${v['price']:,}")
-        return "\n".join(lines)
+        return "\n".join(
+            f"- {v['year']} {v['brand']} {v['model']} ({v['color']}) - ${v['price']:,}"
+            for v in MockDataStore.iter_available_vehicles()
+        )
     
     def _build_graph(self) -> StateGraph:
         """Build the multi-agent workflow graph."""
@@ -1,13 +1,15 @@
 """Base Agent class for all AI agents."""
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, asdict, replace
+from functools import cached_property
 from typing import Dict, Any, List, Optional, TypedDict
 from langgraph.graph import StateGraph, END
-from app.config import LLM_PROVIDER
+from app.config import get_settings
 
 
 def get_llm_service():
     """Get the appropriate LLM service based on configuration."""
-    if LLM_PROVIDER == "openai":
+    if get_settings().llm_provider == "openai":
         # Recommended: Direct httpx calls to OpenRouter - simpler and reliable
         from app.services.openai_service import OpenAIService
         return OpenAIService.get_instance()
@@ -25,6 +27,26 @@ class AgentState(TypedDict):
     result: Optional[str]
 
 
+@dataclass(frozen=True)
+class WorkflowStep:
+    """Immutable snapshot of a single workflow step for streaming."""
+    step: str
+    label: str
+    status: str = "active"
+
+    def complete(self) -> "WorkflowStep":
+        """Return a copy of this step marked as complete."""
+        return replace(self, status="complete")
+
+    def event(self, index: int) -> Dict[str, Any]:
+        """Build an incremental workflow_step event.
+
+        Only the changed step and its position are sent; the client
+        accumulates the full step list from successive events.
+        """
+        return {"type": "workflow_step", "step": asdict(self), "index": index}
+
+
 class BaseAgent(ABC):
     """Abstract base class for all agents."""
     
@@ -44,17 +66,23 @@ class BaseAgent(ABC):
         """Get the system prompt for this agent."""
         pass
     
+    @cached_property
+    def system_prompt(self) -> str:
+        """System prompt built once per agent instance.
+
+        Several agents render mock data into their prompt; that data is
+        fixed for the life of the process, so the string is reused.
+        """
+        return self.get_system_prompt()
+    
     def _build_messages_with_history(
         self, 
         user_input: str, 
         conversation_history: Optional[List[Dict[str, str]]] = None
     ) -> List[Dict[str, str]]:
         """Build messages list including conversation history."""
-        messages = []
-        if conversation_history:
-            messages.extend(conversation_history)
-        messages.append({"role": "user", "content": user_input})
-        return messages
+        # New list each call, so the caller's history is never mutated
+        return [*(conversation_history or ()), {"role": "user", "content": user_input}]
     
     async def run(
         self, 
@@ -84,5 +112,5 @@ class BaseAgent(ABC):
     
     async def chat(self, messages: List[Dict[str, str]], context: Optional[Dict[str, Any]] = None) -> str:
         """Simple chat interface without full workflow."""
-        return await self.llm_service.chat(messages, self.get_system_prompt())
+        return await self.llm_service.chat(messages, self.system_prompt)
 
@@ -86,7 +86,7 @@ Provide a compliance gap analysis with:
 Format each action item as:
 [PRIORITY] Description - Affected SOP - Deadline"""
 
-        response = await self.llm_service.generate(analysis_prompt, self.get_system_prompt())
+        response = await self.llm_service.generate(analysis_prompt, self.system_prompt)
         
         return {
             "analysis": response,
@@ -112,7 +112,7 @@ Format each action item as:
             else:
                 response = await self.llm_service.chat(
                     state["messages"],
-                    self.get_system_prompt()
+                    self.system_prompt
                 )
                 state["result"] = response
             
@@ -168,7 +168,7 @@ Format each action item as:
             # Generate response with full conversation history
             response = await self.llm_service.chat(
                 messages,
-                self.get_system_prompt()
+                self.system_prompt
             )
             
             await asyncio.sleep(STEP_DELAY)
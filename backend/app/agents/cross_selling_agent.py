@@ -156,7 +156,7 @@ When making recommendations:
                 # General cross-selling inquiry
                 response = await self.llm_service.chat(
                     state["messages"],
-                    self.get_system_prompt()
+                    self.system_prompt
                 )
                 state["result"] = response
             
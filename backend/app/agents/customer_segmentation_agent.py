@@ -3,6 +3,7 @@ from typing import Dict, Any, List, Optional
 from langgraph.graph import StateGraph, END
 from app.agents.base_agent import BaseAgent, AgentState
 from app.data.mock_data import MockDataStore
+from collections import Counter
 import asyncio
 import math
 
@@ -231,12 +232,8 @@ Always explain the reasoning behind segment assignments and recommendations."""
                 results = [self.segment_customer(c) for c in customers]
                 
                 # Group by segment
-                segment_counts = {}
-                total_ltv = 0
-                for r in results:
-                    seg = r["segment"]
-                    segment_counts[seg] = segment_counts.get(seg, 0) + 1
-                    total_ltv += r["predicted_ltv"]
+                segment_counts = Counter(r["segment"] for r in results)
+                total_ltv = sum(MockDataStore.get_customer_column("predicted_ltv"))
                 
                 response_parts = [
                     "## 👥 Customer Segmentation Dashboard\n",
@@ -245,7 +242,7 @@ Always explain the reasoning behind segment assignments and recommendations."""
                     "### Segment Distribution:\n"
                 ]
                 
-                for seg, count in sorted(segment_counts.items(), key=lambda x: -x[1]):
+                for seg, count in segment_counts.most_common():
                     info = MockDataStore.CUSTOMER_SEGMENTS.get(seg, {})
                     color_emoji = {"Champion": "🏆", "VIP": "⭐", "Growing": "📈", "Regular": "👤", "At Risk": "⚠️", "Declining": "📉"}.get(seg, "👤")
                     response_parts.append(f"{color_emoji} **{seg}**: {count} customers")
@@ -342,7 +339,7 @@ Always explain the reasoning behind segment assignments and recommendations."""
                 # General inquiry - use LLM
                 response = await self.llm_service.chat(
                     state["messages"],
-                    self.get_system_prompt()
+                    self.system_prompt
                 )
                 state["result"] = response
             
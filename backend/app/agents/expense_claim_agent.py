@@ -12,17 +12,20 @@ from langgraph.graph import StateGraph, END
 from datetime import datetime
 import uuid
 import asyncio
+import logging
 import json
 import re
 
-from .base_agent import BaseAgent
-from app.services.llm_service import LLMService
+from .base_agent import BaseAgent, get_llm_service
 from app.services.vision_service import VisionService
+from app.services.approval_store import ApprovalStore
 from app.data.mock_data import MockDataStore
 
+logger = logging.getLogger(__name__)
+
 
 # Store for pending approvals (in production, use a proper database)
-EXPENSE_PENDING_APPROVALS = {}
+EXPENSE_PENDING_APPROVALS = ApprovalStore()
 
 
 class ExpenseClaimState(TypedDict):
@@ -47,8 +50,8 @@ class OCRAgent:
     """Agent responsible for extracting data from receipt images."""
     
     def __init__(self):
-        self.llm_service = LLMService.get_instance()
-        self.vision_service = VisionService()
+        self.llm_service = get_llm_service()
+        self.vision_service = VisionService.get_instance()
     
     def get_system_prompt(self) -> str:
         return """You are an OCR specialist agent for expense claims. Your job is to:
@@ -101,8 +104,7 @@ Return ONLY the JSON object, no other text."""
                 else:
                     mime_type = "image/jpeg"
             
-            print(f"[OCR] Calling vision API with mime_type: {mime_type}")
-            print(f"[OCR] Image base64 length: {len(image_base64)}")
+            logger.debug("Calling vision API with mime_type %s, base64 length %d", mime_type, len(image_base64))
             
             analysis = await self.vision_service.analyze_image(
                 image_base64,
@@ -110,11 +112,14 @@ Return ONLY the JSON object, no other text."""
                 mime_type
             )
             
-            print(f"[OCR] Vision API response: {analysis[:500]}...")
+            logger.debug("Vision API response: %.500s", analysis)
             
             # Parse the JSON response from GPT-4o
             ocr_data = self._parse_vision_response(analysis)
-            print(f"[OCR] Parsed data: merchant={ocr_data.get('merchant')}, amount={ocr_data.get('total_amount')}, currency={ocr_data.get('currency')}")
+            logger.debug(
+                "Parsed data: merchant=%s, amount=%s, currency=%s",
+                ocr_data.get("merchant"), ocr_data.get("total_amount"), ocr_data.get("currency")
+            )
             ocr_data["raw_analysis"] = analysis
             ocr_data["extracted_at"] = datetime.now().isoformat()
             ocr_data["confidence"] = "high"
@@ -153,7 +158,7 @@ Return ONLY the JSON object, no other text."""
             return self._parse_text_response(response)
             
         except Exception as e:
-            print(f"Error parsing vision response: {e}")
+            logger.warning("Error parsing vision response: %s", e)
             return self._get_default_ocr_data()
     
     def _normalize_ocr_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -305,7 +310,7 @@ class ValidationAgent:
     """Agent responsible for validating expense claims against company policy."""
     
     def __init__(self):
-        self.llm_service = LLMService.get_instance()
+        self.llm_service = get_llm_service()
         
         # Company expense policies (in production, load from database)
         self.policies = {
@@ -730,14 +735,14 @@ Always explain what's happening at each step of the multi-agent workflow."""
         approval_id = context.get("approval_id")
         approved = context.get("approved", False)
         
-        if approval_id not in EXPENSE_PENDING_APPROVALS:
+        pending = EXPENSE_PENDING_APPROVALS.pop(approval_id)
+        if pending is None:
             yield {
                 "type": "response",
                 "content": "❌ Approval session expired or not found. Please start a new expense claim."
             }
             return
         
-        pending = EXPENSE_PENDING_APPROVALS.pop(approval_id)
         state = pending["state"]
         stage = pending["stage"]
         workflow_steps = pending["workflow_steps"]
@@ -11,10 +11,10 @@ Human-in-the-loop approval is required between Inventory and Warehouse agents.
 """
 from typing import Dict, Any, List, TypedDict, Optional
 from langgraph.graph import StateGraph, END
-from app.agents.base_agent import BaseAgent
+from app.agents.base_agent import BaseAgent, get_llm_service
 from app.data.mock_data import MockDataStore
 from app.tools.fulfillment_tools import FulfillmentTools
-from app.services.llm_service import LLMService
+from app.services.approval_store import ApprovalStore
 import asyncio
 import uuid
 
@@ -22,7 +22,7 @@ import uuid
 STEP_DELAY = 0.8  # seconds
 
 # In-memory storage for pending approvals (in production, use Redis or database)
-PENDING_APPROVALS: Dict[str, Dict[str, Any]] = {}
+PENDING_APPROVALS = ApprovalStore()
 
 
 class FulfillmentChainState(TypedDict):
@@ -60,7 +60,7 @@ class OrderIntakeAgent:
     def __init__(self):
         self.name = "Order Intake Agent"
         self.tools = FulfillmentTools()
-        self.llm_service = LLMService()
+        self.llm_service = get_llm_service()
     
     def get_system_prompt(self) -> str:
         return """You are an Order Intake specialist responsible for:
@@ -123,7 +123,7 @@ class InventoryAgent:
     def __init__(self):
         self.name = "Inventory Agent"
         self.tools = FulfillmentTools()
-        self.llm_service = LLMService()
+        self.llm_service = get_llm_service()
     
     def get_system_prompt(self) -> str:
         return """You are an Inventory Management specialist responsible for:
@@ -190,7 +190,7 @@ class WarehouseAgent:
     def __init__(self):
         self.name = "Warehouse Agent"
         self.tools = FulfillmentTools()
-        self.llm_service = LLMService()
+        self.llm_service = get_llm_service()
     
     def get_system_prompt(self) -> str:
         return """You are a Warehouse Operations specialist responsible for:
@@ -243,7 +243,7 @@ class ShippingAgent:
     def __init__(self):
         self.name = "Shipping Agent"
         self.tools = FulfillmentTools()
-        self.llm_service = LLMService()
+        self.llm_service = get_llm_service()
     
     def get_system_prompt(self) -> str:
         return """You are a Shipping and Logistics specialist responsible for:
@@ -519,7 +519,7 @@ Your role is to:
             """Handle general queries about fulfillment."""
             response = await self.llm_service.chat(
                 state["messages"],
-                self.get_system_prompt()
+                self.system_prompt
             )
             state["result"] = response
             state["messages"].append({"role": "assistant", "content": response})
@@ -629,7 +629,7 @@ Your role is to:
         
         # Check if this is an order or general query
         if not any(kw in user_message for kw in order_keywords):
-            response = await self.llm_service.chat(messages, self.get_system_prompt())
+            response = await self.llm_service.chat(messages, self.system_prompt)
             yield {"type": "response", "content": response}
             return
         
@@ -749,11 +749,11 @@ Your role is to:
     async def _continue_after_approval(self, approval_id: str, approved: bool):
         """Continue the agent chain after human approval."""
         
-        if approval_id not in PENDING_APPROVALS:
+        data = PENDING_APPROVALS.pop(approval_id)
+        if data is None:
             yield {"type": "error", "content": f"Approval {approval_id} not found or expired."}
             return
         
-        data = PENDING_APPROVALS.pop(approval_id)
         workflow_steps = data["workflow_steps"]
         agent_chain = data["agent_chain"]
         agent_outputs = data["agent_outputs"]
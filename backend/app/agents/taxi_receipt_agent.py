@@ -11,16 +11,19 @@ from langgraph.graph import StateGraph, END
 from datetime import datetime
 import uuid
 import asyncio
+import logging
 import json
 import re
 
-from .base_agent import BaseAgent
-from app.services.llm_service import LLMService
+from .base_agent import BaseAgent, get_llm_service
 from app.services.vision_service import VisionService
+from app.services.approval_store import ApprovalStore
+
+logger = logging.getLogger(__name__)
 
 
 # Store for pending approvals
-TAXI_PENDING_APPROVALS = {}
+TAXI_PENDING_APPROVALS = ApprovalStore()
 
 
 class TaxiReceiptState(TypedDict):
@@ -43,8 +46,8 @@ class TaxiOCRAgent:
     """Agent specialized for extracting data from HK taxi receipts."""
     
     def __init__(self):
-        self.llm_service = LLMService.get_instance()
-        self.vision_service = VisionService()
+        self.llm_service = get_llm_service()
+        self.vision_service = VisionService.get_instance()
     
     def get_system_prompt(self) -> str:
         return """You are a specialized OCR agent for Hong Kong taxi receipts.
@@ -99,8 +102,7 @@ Return ONLY the JSON object, no other text."""
                 else:
                     mime_type = "image/jpeg"
             
-            print(f"[TaxiOCR] Calling vision API with mime_type: {mime_type}")
-            print(f"[TaxiOCR] Image base64 length: {len(image_base64)}")
+            logger.debug("Calling vision API with mime_type %s, base64 length %d", mime_type, len(image_base64))
             
             analysis = await self.vision_service.analyze_image(
                 image_base64,
@@ -108,10 +110,13 @@ Return ONLY the JSON object, no other text."""
                 mime_type
             )
             
-            print(f"[TaxiOCR] Vision API response: {analysis[:500]}...")
+            logger.debug("Vision API response: %.500s", analysis)
             
             taxi_data = self._parse_taxi_response(analysis)
-            print(f"[TaxiOCR] Parsed: taxi={taxi_data.get('taxi_number')}, fare={taxi_data.get('total_fare')} {taxi_data.get('currency')}")
+            logger.debug(
+                "Parsed: taxi=%s, fare=%s %s",
+                taxi_data.get("taxi_number"), taxi_data.get("total_fare"), taxi_data.get("currency")
+            )
             
             taxi_data["raw_analysis"] = analysis
             taxi_data["extracted_at"] = datetime.now().isoformat()
@@ -148,7 +153,7 @@ Return ONLY the JSON object, no other text."""
             return self._parse_taxi_text(response)
             
         except Exception as e:
-            print(f"[TaxiOCR] Error parsing response: {e}")
+            logger.warning("Error parsing taxi receipt response: %s", e)
             return self._get_default_taxi_data()
     
     def _normalize_taxi_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -262,7 +267,7 @@ class TaxiValidationAgent:
     """Agent for validating taxi expense claims."""
     
     def __init__(self):
-        self.llm_service = LLMService.get_instance()
+        self.llm_service = get_llm_service()
         # Taxi expense policies
         self.policies = {
             "max_single_trip": 500,  # HKD per trip
@@ -567,11 +572,11 @@ The workflow: OCR extraction → Policy validation → Supervisor approval → P
         approval_id = context.get("approval_id")
         approved = context.get("approved", False)
         
-        if approval_id not in TAXI_PENDING_APPROVALS:
+        pending = TAXI_PENDING_APPROVALS.pop(approval_id)
+        if pending is None:
             yield {"type": "response", "content": "❌ Approval session expired. Please submit a new taxi claim."}
             return
         
-        pending = TAXI_PENDING_APPROVALS.pop(approval_id)
         state = pending["state"]
         workflow_steps = pending["workflow_steps"]
         
@@ -1,13 +1,18 @@
 """Trend Spotter Agent - Social sentiment and trend analysis."""
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
+import orjson
 from langgraph.graph import StateGraph, END
 from app.agents.base_agent import BaseAgent, AgentState
 from app.data.mock_data import MockDataStore
+from app.data._static_prompts import TRENDS_CONTEXT, SUPPLIERS_CONTEXT
 
 
 class TrendSpotterAgent(BaseAgent):
     """Agent for social media trend spotting and sentiment analysis."""
     
+    # (MockDataStore.version, serialized dashboard) for the /trends/dashboard endpoint
+    _dashboard_bytes_cache: Optional[Tuple[int, bytes]] = None
+    
     def __init__(self):
         super().__init__(
             name="Trend Spotter",
@@ -43,19 +48,12 @@ When analyzing trends:
 Provide data-driven recommendations with clear action items."""
 
     def _get_trends_context(self) -> str:
-        """Get current trends as context."""
-        lines = []
-        for trend in MockDataStore.get_trending_items():
-            lines.append(f"- {trend['trend']}: {trend['mentions']:,} mentions ({trend['growth']}) on {trend['platform']} - {trend['sentiment']} sentiment")
-        return "\n".join(lines)
+        """Get current trends as context (pre-rendered from mock data)."""
+        return TRENDS_CONTEXT
     
     def _get_suppliers_context(self) -> str:
-        """Get supplier info as context."""
-        lines = []
-        for category, suppliers in MockDataStore.SUPPLIERS.items():
-            for s in suppliers:
-                lines.append(f"- {s['name']} ({category}): {', '.join(s['products'])}")
-        return "\n".join(lines)
+        """Get supplier info as context (pre-rendered from mock data)."""
+        return SUPPLIERS_CONTEXT
     
     def get_dashboard_data(self) -> Dict[str, Any]:
         """Get trend dashboard data."""
@@ -69,6 +67,41 @@ Provide data-driven recommendations with clear action items."""
             "last_updated": "2024-01-15T10:00:00Z"
         }
     
+    def get_dashboard_bytes(self) -> bytes:
+        """Get trend dashboard data pre-serialized as JSON.
+        
+        The payload is cached and only rebuilt when MockDataStore.version changes.
+        """
+        cache = self._dashboard_bytes_cache
+        if cache is None or cache[0] != MockDataStore.version:
+            cache = (MockDataStore.version, orjson.dumps(self.get_dashboard_data()))
+            self._dashboard_bytes_cache = cache
+        return cache[1]
+    
+    def _is_dashboard_query(self, user_input: str) -> bool:
+        """Check whether the (lowercased) user input asks for the dashboard."""
+        return "dashboard" in user_input or "overview" in user_input
+    
+    async def run_with_streaming(
+        self,
+        user_input: str,
+        context: Dict[str, Any] = None,
+        conversation_history: List[Dict[str, str]] = None
+    ):
+        """Run trend analysis, streaming LLM tokens as they arrive."""
+        if self._is_dashboard_query(user_input.lower()):
+            result = await self.run(user_input, context, conversation_history)
+            yield {"type": "response", "content": result["response"]}
+            return
+        
+        messages = self._build_messages_with_history(user_input, conversation_history)
+        chunks = []
+        async for token in self.llm_service.chat_stream(messages, self.system_prompt):
+            chunks.append(token)
+            yield {"type": "token", "content": token}
+        
+        yield {"type": "response", "content": "".join(chunks)}
+    
     def _build_graph(self) -> StateGraph:
         """Build the trend analysis workflow."""
         
@@ -77,7 +110,7 @@ Provide data-driven recommendations with clear action items."""
             user_input = state["messages"][-1]["content"].lower()
             
             # Check for specific trend queries
-            if "dashboard" in user_input or "overview" in user_input:
+            if self._is_dashboard_query(user_input):
                 dashboard = self.get_dashboard_data()
                 trends_text = "\n".join([
                     f"📈 **{t['trend']}** - {t['mentions']:,} mentions ({t['growth']}) on {t['platform']}"
@@ -100,7 +133,7 @@ Would you like me to dive deeper into any specific trend or provide supplier rec
                 # General trend analysis query
                 response = await self.llm_service.chat(
                     state["messages"],
-                    self.get_system_prompt()
+                    self.system_prompt
                 )
                 state["result"] = response
             
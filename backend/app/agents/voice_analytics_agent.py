@@ -1,13 +1,40 @@
 """Voice Analytics Agent - Customer service call sentiment analysis."""
+from dataclasses import asdict
 from typing import Dict, Any, List, Optional
 from langgraph.graph import StateGraph, END
-from app.agents.base_agent import BaseAgent, AgentState
+from app.agents.base_agent import BaseAgent, AgentState, WorkflowStep
 from app.data.mock_data import MockDataStore
 import asyncio
+import re
 
 # Delay between workflow steps
 STEP_DELAY = 1.0
 
+# Keyword matchers for query routing (one scan instead of N substring checks).
+# Keywords match as word prefixes, so inflections like "returns" and
+# "cancelled" still count; topics are listed in priority order.
+_TOPICS = ("return", "billing", "inquiry", "cancel")
+_TOPIC_RE = re.compile(r"\b(" + "|".join(_TOPICS) + ")", re.IGNORECASE)
+_DASHBOARD_RE = re.compile(r"\b(?:dashboard|overview|all calls)", re.IGNORECASE)
+
+
+def _find_topic(user_input_lower: str) -> Optional[str]:
+    """Return the highest-priority topic mentioned in a lowercased query, if any."""
+    mentioned = set(_TOPIC_RE.findall(user_input_lower))
+    return next((topic for topic in _TOPICS if topic in mentioned), None)
+
+
+# Simulated sentiment scoring
+_SENTIMENT_SCORES = {
+    "very_positive": 1.0,
+    "positive": 0.75,
+    "neutral": 0.5,
+    "negative": 0.25,
+    "very_negative": 0.0
+}
+_NEGATIVE_WORDS = ("frustrated", "angry", "upset", "fed up")
+_POSITIVE_WORDS = ("thank", "great", "wonderful", "appreciate", "helpful")
+
 
 class VoiceAnalyticsAgent(BaseAgent):
     """Agent for analyzing customer service call recordings."""
@@ -17,6 +44,8 @@ class VoiceAnalyticsAgent(BaseAgent):
             name="Voice Analytics Agent",
             description="Analyzes customer service calls for sentiment and insights"
         )
+        # Analyses are pure functions of the static call data: (data version, call id) -> result
+        self._analysis_cache: Dict[tuple, Dict[str, Any]] = {}
     
     def get_system_prompt(self) -> str:
         return """You are an expert voice analytics AI assistant specialized in customer service analysis.
@@ -39,38 +68,40 @@ When analyzing calls, provide:
 Be specific with timestamps and quotes from the transcript."""
 
     def analyze_call(self, call_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze a call recording with sentiment scoring."""
-        transcript = call_data.get("transcript", [])
+        """Analyze a call recording with sentiment scoring.
         
-        # Simulate sentiment analysis
-        sentiment_labels = {
-            "very_positive": 1.0,
-            "positive": 0.75,
-            "neutral": 0.5,
-            "negative": 0.25,
-            "very_negative": 0.0
-        }
+        Results are computed once per call and data version; treat them as read-only.
+        """
+        key = (MockDataStore.version, call_data["id"])
+        analysis = self._analysis_cache.get(key)
+        if analysis is None:
+            analysis = self._analysis_cache[key] = self._analyze_call(call_data)
+        return analysis
+    
+    def _analyze_call(self, call_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Score a call's sentiment journey and find its key moments."""
+        transcript = call_data.get("transcript", [])
         
         journey = call_data.get("sentiment_journey", [])
-        journey_scores = [sentiment_labels.get(s, 0.5) for s in journey]
+        journey_scores = [_SENTIMENT_SCORES.get(s, 0.5) for s in journey]
         
         # Find key moments
         key_moments = []
-        for i, line in enumerate(transcript):
-            text_lower = line["text"].lower()
-            if any(word in text_lower for word in ["frustrated", "angry", "upset", "fed up"]):
+        for line in transcript:
+            text_lower = line.text.lower()
+            if any(word in text_lower for word in _NEGATIVE_WORDS):
                 key_moments.append({
-                    "timestamp": line["timestamp"],
+                    "timestamp": line.timestamp,
                     "type": "negative_peak",
-                    "text": line["text"][:50] + "...",
-                    "speaker": line["speaker"]
+                    "text": line.text[:50] + "...",
+                    "speaker": line.speaker
                 })
-            elif any(word in text_lower for word in ["thank", "great", "wonderful", "appreciate", "helpful"]):
+            elif any(word in text_lower for word in _POSITIVE_WORDS):
                 key_moments.append({
-                    "timestamp": line["timestamp"],
+                    "timestamp": line.timestamp,
                     "type": "positive_peak",
-                    "text": line["text"][:50] + "...",
-                    "speaker": line["speaker"]
+                    "text": line.text[:50] + "...",
+                    "speaker": line.speaker
                 })
         
         return {
@@ -85,6 +116,21 @@ Be specific with timestamps and quotes from the transcript."""
             "duration": call_data.get("duration")
         }
     
+    def _find_call_id(self, user_input: str) -> Optional[str]:
+        """Find a call ID mentioned in the (lowercased) user input."""
+        for call in MockDataStore.CALL_RECORDINGS:
+            if call["id"].lower() in user_input:
+                return call["id"]
+        return None
+    
+    def _is_dashboard_query(self, user_input: str) -> bool:
+        """Check whether the (lowercased) user input asks for the calls overview."""
+        return _DASHBOARD_RE.search(user_input) is not None
+    
+    def _needs_llm(self, user_input: str) -> bool:
+        """Check whether the query falls through to a general LLM answer."""
+        return not self._is_dashboard_query(user_input) and self._find_call_id(user_input) is None
+    
     def _build_graph(self) -> StateGraph:
         """Build the voice analytics workflow."""
         
@@ -93,20 +139,12 @@ Be specific with timestamps and quotes from the transcript."""
             user_input = state["messages"][-1]["content"].lower()
             
             # Check if user wants to analyze a specific call
-            call_id = None
-            for call in MockDataStore.CALL_RECORDINGS:
-                if call["id"].lower() in user_input:
-                    call_id = call["id"]
-                    break
+            call_id = self._find_call_id(user_input)
             
             # Check for topic-based search
-            topic_filter = None
-            for topic in ["return", "billing", "inquiry", "cancel"]:
-                if topic in user_input:
-                    topic_filter = topic
-                    break
+            topic_filter = _find_topic(user_input)
             
-            if "all calls" in user_input or "overview" in user_input or "dashboard" in user_input:
+            if self._is_dashboard_query(user_input):
                 # Show all calls summary
                 calls = MockDataStore.get_call_recordings()
                 analysis_results = [self.analyze_call(call) for call in calls]
@@ -154,8 +192,8 @@ Be specific with timestamps and quotes from the transcript."""
                     ]
                     
                     for line in call["transcript"]:
-                        emoji = "👤" if line["speaker"] == "Customer" else "🎧"
-                        response_parts.append(f"{emoji} [{line['timestamp']}] **{line['speaker']}:** {line['text']}")
+                        emoji = "👤" if line.speaker == "Customer" else "🎧"
+                        response_parts.append(f"{emoji} [{line.timestamp}] **{line.speaker}:** {line.text}")
                     
                     if analysis["key_moments"]:
                         response_parts.append("\n### Key Moments:")
@@ -205,48 +243,59 @@ Be specific with timestamps and quotes from the transcript."""
         context: Dict[str, Any] = None,
         conversation_history: List[Dict[str, str]] = None
     ):
-        """Run voice analytics with streaming step updates."""
-        workflow_steps = []
+        """Run voice analytics with streaming step updates.
+
+        Workflow events are incremental (``step`` + ``index``); the full step
+        list is only attached to the terminal response event.
+        """
+        workflow_steps: List[WorkflowStep] = []
         messages = self._build_messages_with_history(user_input, conversation_history)
         
         # Step 1: Receive Audio/Transcript
-        step1 = {"step": "receive", "status": "active", "label": "Receive Recording"}
-        workflow_steps.append(step1)
-        yield {"type": "workflow_step", "step": step1, "all_steps": workflow_steps.copy()}
+        workflow_steps.append(WorkflowStep("receive", "Receive Recording"))
+        yield workflow_steps[0].event(0)
         
         await asyncio.sleep(STEP_DELAY)
-        workflow_steps[-1]["status"] = "complete"
-        yield {"type": "workflow_step", "step": workflow_steps[-1], "all_steps": workflow_steps.copy()}
+        workflow_steps[0] = workflow_steps[0].complete()
+        yield workflow_steps[0].event(0)
         
         # Step 2: Transcribe (simulated)
-        step2 = {"step": "transcribe", "status": "active", "label": "Transcribe Audio"}
-        workflow_steps.append(step2)
-        yield {"type": "workflow_step", "step": step2, "all_steps": workflow_steps.copy()}
+        workflow_steps.append(WorkflowStep("transcribe", "Transcribe Audio"))
+        yield workflow_steps[1].event(1)
         
         await asyncio.sleep(STEP_DELAY)
-        workflow_steps[-1]["status"] = "complete"
-        yield {"type": "workflow_step", "step": workflow_steps[-1], "all_steps": workflow_steps.copy()}
+        workflow_steps[1] = workflow_steps[1].complete()
+        yield workflow_steps[1].event(1)
         
         # Step 3: Analyze Sentiment
-        step3 = {"step": "sentiment", "status": "active", "label": "Analyze Sentiment"}
-        workflow_steps.append(step3)
-        yield {"type": "workflow_step", "step": step3, "all_steps": workflow_steps.copy()}
+        workflow_steps.append(WorkflowStep("sentiment", "Analyze Sentiment"))
+        yield workflow_steps[2].event(2)
         
         await asyncio.sleep(STEP_DELAY)
-        workflow_steps[-1]["status"] = "complete"
-        yield {"type": "workflow_step", "step": workflow_steps[-1], "all_steps": workflow_steps.copy()}
+        workflow_steps[2] = workflow_steps[2].complete()
+        yield workflow_steps[2].event(2)
         
         # Step 4: Generate Insights
-        step4 = {"step": "insights", "status": "active", "label": "Generate Insights"}
-        workflow_steps.append(step4)
-        yield {"type": "workflow_step", "step": step4, "all_steps": workflow_steps.copy()}
+        workflow_steps.append(WorkflowStep("insights", "Generate Insights"))
+        yield workflow_steps[3].event(3)
         
-        # Run the actual analysis
-        result = await self.run(user_input, context, conversation_history)
+        # Run the actual analysis, streaming tokens when the LLM answers
+        if self._needs_llm(user_input.lower()):
+            chunks = []
+            async for token in self.llm_service.chat_stream(messages, self.get_system_prompt()):
+                chunks.append(token)
+                yield {"type": "token", "content": token}
+            response = "".join(chunks)
+        else:
+            result = await self.run(user_input, context, conversation_history)
+            response = result["response"]
         
         await asyncio.sleep(STEP_DELAY)
-        workflow_steps[-1]["status"] = "complete"
-        yield {"type": "workflow_step", "step": workflow_steps[-1], "all_steps": workflow_steps.copy()}
+        workflow_steps[3] = workflow_steps[3].complete()
+        yield workflow_steps[3].event(3)
         
-        yield {"type": "response", "content": result["response"]}
-
+        yield {
+            "type": "response",
+            "content": response,
+            "all_steps": [asdict(s) for s in workflow_steps]
+        }
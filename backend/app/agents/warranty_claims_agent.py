@@ -1,15 +1,100 @@
 """Warranty Claims Agent - Real multi-step workflow with fraud detection."""
-from typing import Dict, Any, List, TypedDict, Optional
+from typing import Dict, Any, List, TypedDict, Optional, Tuple, Annotated
 from langgraph.graph import StateGraph, END
 from app.agents.base_agent import BaseAgent
 from app.services.vision_service import VisionService
+from app.services.vision_batcher import AsyncBatchQueue
 from app.data.mock_data import MockDataStore
 from app.tools.warranty_tools import WarrantyTools
+from app.config import get_settings
 import asyncio
+import re
 
-# Delay between workflow steps to simulate real processing
+# Delay between workflow steps to simulate real processing (only when simulate_delay is on)
 STEP_DELAY = 1.0  # seconds
 
+_SN_RE = re.compile(r'SN-\d+', re.IGNORECASE)
+
+# Keywords that route a message into the claim workflow instead of a general answer
+_CLAIM_KEYWORDS = frozenset(["claim", "warranty", "serial", "sn-", "process", "broken", "defect", "return"])
+
+# Bare serial digits recognised without the "SN-" prefix
+_SN_FALLBACK = {
+    "12345678": "SN-12345678",
+    "87654321": "SN-87654321",
+    "11111111": "SN-11111111",
+}
+_DEFAULT_SERIAL = "SN-12345678"
+
+# Workflow step ids and their display labels, in execution order
+_STEPS = (
+    ("receive", "Receive Claim"),
+    ("extract", "Extract Data"),
+    ("verify", "Verify Warranty"),
+    ("fraud", "Fraud Check"),
+    ("decide", "Decision"),
+)
+_RECEIVE, _EXTRACT, _VERIFY, _FRAUD, _DECIDE = range(len(_STEPS))
+_STEP_LABELS = dict(_STEPS)
+
+# Display lookups shared by both response builders
+_RISK_EMOJI = {"low": "🟢", "medium": "🟡", "high": "🔴"}
+_DECISION_EMOJI = {
+    "approved": "✅",
+    "approved_with_review": "✅",
+    "rejected": "❌",
+    "review_required": "⚠️",
+    "escalated": "⚠️"
+}
+_STEP_EMOJI = {"complete": "✅", "active": "⏳"}
+
+# Static so every general-query call sends a byte-identical system prefix
+_WARRANTY_SYSTEM_PROMPT = """You are an expert warranty claims processing AI agent.
+
+You execute a multi-step workflow to process claims:
+1. RECEIVE CLAIM - Log the incoming claim with customer and product details
+2. EXTRACT DATA - Use OCR to extract receipt/document information
+3. VERIFY WARRANTY - Check if product is under warranty
+4. FRAUD CHECK - Analyze for fraud indicators
+5. MAKE DECISION - Approve, reject, or escalate the claim
+
+When processing claims:
+- Always verify the serial number against our database
+- Check for previous claims on the same serial number
+- Look for fraud indicators like altered documents
+- Provide clear explanations for decisions
+
+Known serial numbers in our system:
+- SN-12345678: Smart Air Purifier (Valid warranty until 2026-06-15)
+- SN-87654321: Robot Vacuum (Valid until 2025-12-01, has 1 previous claim)
+- SN-11111111: Electric Kettle (Warranty EXPIRED 2024-01-10)"""
+
+# End-of-stream marker for the run_with_streaming event queue
+_SENTINEL = object()
+
+RECEIPT_EXTRACTION_PROMPT = "Extract all information from this receipt: store name, date, product, price, serial number."
+
+
+def _resolve_serial(message: str) -> str:
+    """Find the serial number in a message, falling back to known bare digits."""
+    sn_match = _SN_RE.search(message)
+    if sn_match:
+        return sn_match.group().upper()
+    return next((sn for digits, sn in _SN_FALLBACK.items() if digits in message), _DEFAULT_SERIAL)
+
+
+def _is_claim_message(message_lower: str) -> bool:
+    """Whether an already-lowercased message should enter the claim workflow."""
+    return any(kw in message_lower for kw in _CLAIM_KEYWORDS)
+
+
+def _append_reducer(existing: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Append workflow steps returned by a node to those already in the state."""
+    return (existing or []) + (new or [])
+
+
+StepOutcome = Tuple[Dict[str, Any], Dict[str, Any]]
+
 
 class WarrantyState(TypedDict):
     """State for warranty claims workflow."""
@@ -22,273 +107,302 @@ class WarrantyState(TypedDict):
     warranty_info: Optional[Dict[str, Any]]
     fraud_check: Optional[Dict[str, Any]]
     decision: Optional[Dict[str, Any]]
-    workflow_steps: List[Dict[str, Any]]
+    workflow_steps: Annotated[List[Dict[str, Any]], _append_reducer]
     result: Optional[str]
 
 
 class WarrantyClaimsAgent(BaseAgent):
-    """Agent for processing warranty claims with real multi-step workflow."""
+    """Agent for processing warranty claims with real multi-step workflow.
+    
+    Receipt OCR is opt-in: an attached image is only sent to the vision model
+    (through vision_batcher) when the context also sets require_receipt_ocr.
+    The HTTP routes never set it, so uploads from the UI use the simulated
+    receipt data; the verdict does not read receipt fields either way.
+    """
     
     def __init__(self):
         self.tools = WarrantyTools()
+        self.simulate_delay = get_settings().warranty_simulate_delay
         self.vision_service = VisionService.get_instance()
+        # Coalesces receipt OCR calls from concurrent claims; the loop starts on first use
+        self.vision_batcher = AsyncBatchQueue(
+            process_fn=self.vision_service.analyze_images_batch,
+            single_fn=self.vision_service.analyze_image,
+            max_batch_size=8,
+            max_wait_time=0.05
+        )
         super().__init__(
             name="Warranty Claims Processor",
             description="Processes warranty claims with OCR and fraud detection"
         )
+        # Compile once; the compiled graph is stateless and reused across runs
+        self._compiled = self.graph.compile()
     
     def get_system_prompt(self) -> str:
-        return """You are an expert warranty claims processing AI agent.
-
-You execute a multi-step workflow to process claims:
-1. RECEIVE CLAIM - Log the incoming claim with customer and product details
-2. EXTRACT DATA - Use OCR to extract receipt/document information
-3. VERIFY WARRANTY - Check if product is under warranty
-4. FRAUD CHECK - Analyze for fraud indicators
-5. MAKE DECISION - Approve, reject, or escalate the claim
-
-When processing claims:
-- Always verify the serial number against our database
-- Check for previous claims on the same serial number
-- Look for fraud indicators like altered documents
-- Provide clear explanations for decisions
-
-Known serial numbers in our system:
-- SN-12345678: Smart Air Purifier (Valid warranty until 2026-06-15)
-- SN-87654321: Robot Vacuum (Valid until 2025-12-01, has 1 previous claim)
-- SN-11111111: Electric Kettle (Warranty EXPIRED 2024-01-10)"""
+        return _WARRANTY_SYSTEM_PROMPT
 
+    async def _simulate_step_delay(self):
+        """Pause between steps for demo visualization; a no-op unless simulate_delay is set."""
+        if self.simulate_delay:
+            await asyncio.sleep(STEP_DELAY)
+    
+    def _initial_state(
+        self,
+        user_input: str,
+        context: Dict[str, Any] = None,
+        conversation_history: List[Dict[str, str]] = None
+    ) -> WarrantyState:
+        """Build the starting state shared by run and run_with_streaming."""
+        return {
+            "messages": self._build_messages_with_history(user_input, conversation_history),
+            "context": context or {},
+            "current_step": "start",
+            "claim_id": None,
+            "serial_number": None,
+            "receipt_data": None,
+            "warranty_info": None,
+            "fraud_check": None,
+            "decision": None,
+            "workflow_steps": [],
+            "result": None
+        }
+    
+    @staticmethod
+    def _new_step(step_id: str) -> Dict[str, Any]:
+        """Create an active workflow step entry."""
+        return {"step": step_id, "status": "active", "label": _STEP_LABELS[step_id]}
+    
+    # Response sections for run_with_streaming, each sent as soon as its step completes
+    
+    @staticmethod
+    def _response_header(claim_id: str, serial_number: str) -> str:
+        return (
+            "## 🛡️ Warranty Claim Processed\n\n"
+            f"**Claim ID:** {claim_id}\n\n"
+            f"**Serial Number:** {serial_number}"
+        )
+    
+    @staticmethod
+    def _response_warranty(warranty_info: Dict[str, Any]) -> str:
+        if warranty_info["warranty_valid"]:
+            warranty_status = f"✅ Product under warranty until {warranty_info.get('warranty_end')}"
+        else:
+            warranty_status = f"❌ Warranty expired on {warranty_info.get('warranty_end')}"
+        return f"\n### Warranty Status:\n{warranty_status}"
+    
+    @staticmethod
+    def _response_fraud(fraud_check: Dict[str, Any]) -> str:
+        risk_emoji = _RISK_EMOJI.get(fraud_check["risk_level"], "⚪")
+        return f"\n### Fraud Analysis:\n- **Risk Level:** {risk_emoji} {fraud_check['risk_level'].upper()}"
+    
+    @staticmethod
+    def _response_decision(decision: Dict[str, Any]) -> str:
+        decision_emoji = _DECISION_EMOJI.get(decision["decision"], "❓")
+        return (
+            f"\n### Final Decision: {decision_emoji} **{decision['decision'].upper()}**\n"
+            f"- **Reason:** {decision['reason']}\n"
+            f"- **Action:** {decision['action']}\n"
+            f"- **Reference:** {decision['reference_number']}"
+        )
+    
+    @staticmethod
+    def _response_workflow(workflow_steps: List[Dict[str, Any]]) -> str:
+        return "\n### Workflow Executed:\n" + "\n".join(
+            f"{_STEP_EMOJI.get(step['status'], '⏳')} **{step['label']}**"
+            for step in workflow_steps
+        )
+    
+    # Step logic shared by the LangGraph nodes and run_with_streaming.
+    # Each step returns (state updates, step summary result) and leaves the state untouched.
+    # WarrantyTools calls are in-memory lookups (cached per serial), so they run
+    # inline; a to_thread hop would cost more than the work it offloads.
+    
+    async def _step_receive(self, state: WarrantyState) -> StepOutcome:
+        """Step 1: Receive and log the claim."""
+        user_message = state["messages"][-1]["content"]
+        
+        # Extract serial number from message
+        serial_number = _resolve_serial(user_message)
+        
+        claim_result = self.tools.receive_claim(
+            serial_number=serial_number,
+            customer_name="Valued Customer",
+            issue_description=user_message
+        )
+        await self._simulate_step_delay()
+        
+        claim_id = claim_result["claim_id"]
+        return {"serial_number": serial_number, "claim_id": claim_id}, {"claim_id": claim_id}
+    
+    async def _step_extract(self, state: WarrantyState) -> StepOutcome:
+        """Step 2: Extract receipt data, running OCR only when the caller asks for it."""
+        context = state["context"]
+        # Nothing downstream (fraud check, decision) reads receipt_data, so the
+        # vision call is opt-in rather than triggered by any attached image
+        if context.get("image_base64") and context.get("require_receipt_ocr", False):
+            extracted_text = await self.vision_batcher.add_request(
+                context["image_base64"],
+                RECEIPT_EXTRACTION_PROMPT
+            )
+            receipt_data = {"raw_text": extracted_text, "source": "ocr"}
+        else:
+            result = self.tools.extract_receipt_data("Simulated receipt")
+            await self._simulate_step_delay()
+            receipt_data = result["extracted_data"]
+        
+        return {"receipt_data": receipt_data}, {"fields_extracted": 6}
+    
+    async def _step_verify(self, state: WarrantyState) -> StepOutcome:
+        """Step 3: Verify warranty status."""
+        result = self.tools.verify_warranty(state["serial_number"])
+        await self._simulate_step_delay()
+        
+        return {"warranty_info": result}, {"valid": result["warranty_valid"], "product": result.get("product")}
+    
+    async def _step_fraud(self, state: WarrantyState) -> StepOutcome:
+        """Step 4: Check for fraud indicators."""
+        warranty_info = state["warranty_info"] or {}
+        
+        result = self.tools.check_fraud_indicators(
+            serial_number=state["serial_number"],
+            claim_history=warranty_info.get("previous_claims", 0),
+            purchase_date=warranty_info.get("purchase_date")
+        )
+        await self._simulate_step_delay()
+        
+        return {"fraud_check": result}, {"risk_level": result["risk_level"], "flags": len(result["fraud_flags"])}
+    
+    async def _step_decide(self, state: WarrantyState) -> StepOutcome:
+        """Step 5: Make final decision."""
+        warranty_info = state["warranty_info"] or {}
+        fraud_check = state["fraud_check"] or {}
+        
+        result = self.tools.make_decision(
+            claim_id=state["claim_id"],
+            warranty_valid=warranty_info.get("warranty_valid", False),
+            fraud_risk=fraud_check.get("risk_level", "low"),
+            issue_description=state["messages"][-1]["content"]
+        )
+        await self._simulate_step_delay()
+        
+        return {"decision": result}, {"decision": result["decision"]}
+    
     def _build_graph(self) -> StateGraph:
         """Build the warranty claims workflow."""
         
-        async def receive_claim(state: WarrantyState) -> WarrantyState:
-            """Step 1: Receive and log the claim."""
-            state["workflow_steps"].append({
-                "step": "receive",
-                "status": "active",
-                "label": "Receive Claim"
-            })
-            
-            user_message = state["messages"][-1]["content"]
-            
-            # Extract serial number from message
-            serial_number = None
-            import re
-            sn_match = re.search(r'SN-\d+', user_message, re.IGNORECASE)
-            if sn_match:
-                serial_number = sn_match.group().upper()
-            elif "12345678" in user_message:
-                serial_number = "SN-12345678"
-            elif "87654321" in user_message:
-                serial_number = "SN-87654321"
-            elif "11111111" in user_message:
-                serial_number = "SN-11111111"
-            
-            state["serial_number"] = serial_number or "SN-12345678"
-            
-            claim_result = self.tools.receive_claim(
-                serial_number=state["serial_number"],
-                customer_name="Valued Customer",
-                issue_description=user_message
-            )
-            await asyncio.sleep(STEP_DELAY)  # Simulate tool execution time
-            
-            state["claim_id"] = claim_result["claim_id"]
-            state["workflow_steps"][-1]["status"] = "complete"
-            state["workflow_steps"][-1]["result"] = {"claim_id": claim_result["claim_id"]}
-            
-            return state
-        
-        async def extract_data(state: WarrantyState) -> WarrantyState:
-            """Step 2: Extract receipt data."""
-            state["workflow_steps"].append({
-                "step": "extract",
-                "status": "active",
-                "label": "Extract Data"
-            })
-            
-            # Check for image in context
-            if state["context"].get("image_base64"):
-                # Use vision to extract
-                extraction_prompt = "Extract all information from this receipt: store name, date, product, price, serial number."
-                extracted_text = await self.vision_service.analyze_image(
-                    state["context"]["image_base64"],
-                    extraction_prompt
-                )
-                state["receipt_data"] = {"raw_text": extracted_text, "source": "ocr"}
-            else:
-                # Simulate extraction
-                result = self.tools.extract_receipt_data("Simulated receipt")
-                await asyncio.sleep(STEP_DELAY)  # Simulate tool execution time
-                state["receipt_data"] = result["extracted_data"]
-            
-            state["workflow_steps"][-1]["status"] = "complete"
-            state["workflow_steps"][-1]["result"] = {"fields_extracted": 6}
-            
-            return state
-        
-        async def verify_warranty(state: WarrantyState) -> WarrantyState:
-            """Step 3: Verify warranty status."""
-            state["workflow_steps"].append({
-                "step": "verify",
-                "status": "active",
-                "label": "Verify Warranty"
-            })
-            
-            result = self.tools.verify_warranty(state["serial_number"])
-            await asyncio.sleep(STEP_DELAY)  # Simulate tool execution time
-            
-            state["warranty_info"] = result
-            state["workflow_steps"][-1]["status"] = "complete"
-            state["workflow_steps"][-1]["result"] = {
-                "valid": result["warranty_valid"],
-                "product": result.get("product")
-            }
-            
-            return state
-        
-        async def check_fraud(state: WarrantyState) -> WarrantyState:
-            """Step 4: Check for fraud indicators."""
-            state["workflow_steps"].append({
-                "step": "fraud",
-                "status": "active",
-                "label": "Fraud Check"
-            })
-            
-            warranty_info = state["warranty_info"] or {}
-            
-            result = self.tools.check_fraud_indicators(
-                serial_number=state["serial_number"],
-                claim_history=warranty_info.get("previous_claims", 0),
-                purchase_date=warranty_info.get("purchase_date")
-            )
-            await asyncio.sleep(STEP_DELAY)  # Simulate tool execution time
-            
-            state["fraud_check"] = result
-            state["workflow_steps"][-1]["status"] = "complete"
-            state["workflow_steps"][-1]["result"] = {
-                "risk_level": result["risk_level"],
-                "flags": len(result["fraud_flags"])
-            }
-            
-            return state
-        
-        async def make_decision(state: WarrantyState) -> WarrantyState:
-            """Step 5: Make final decision."""
-            state["workflow_steps"].append({
-                "step": "decide",
-                "status": "active",
-                "label": "Decision"
-            })
-            
-            warranty_info = state["warranty_info"] or {}
-            fraud_check = state["fraud_check"] or {}
-            
-            result = self.tools.make_decision(
-                claim_id=state["claim_id"],
-                warranty_valid=warranty_info.get("warranty_valid", False),
-                fraud_risk=fraud_check.get("risk_level", "low"),
-                issue_description=state["messages"][-1]["content"]
+        def as_node(step_id: str, step_fn):
+            """Wrap a step method as a graph node returning its updates and completed step."""
+            async def node(state: WarrantyState) -> Dict[str, Any]:
+                updates, result = await step_fn(state)
+                step = {**self._new_step(step_id), "status": "complete", "result": result}
+                return {**updates, "workflow_steps": [step]}
+            return node
+        
+        async def extract_and_verify(state: WarrantyState) -> Dict[str, Any]:
+            """Steps 2 & 3: Extract receipt data and verify warranty concurrently."""
+            # Receipt extraction (possibly a vision call) does not depend on the warranty lookup
+            (extract_updates, extract_result), (verify_updates, verify_result) = await asyncio.gather(
+                self._step_extract(state),
+                self._step_verify(state)
             )
-            await asyncio.sleep(STEP_DELAY)  # Simulate tool execution time
+            extract_step = {**self._new_step("extract"), "status": "complete", "result": extract_result}
+            verify_step = {**self._new_step("verify"), "status": "complete", "result": verify_result}
             
-            state["decision"] = result
-            state["workflow_steps"][-1]["status"] = "complete"
-            state["workflow_steps"][-1]["result"] = {
-                "decision": result["decision"]
-            }
-            
-            return state
+            return {**extract_updates, **verify_updates, "workflow_steps": [extract_step, verify_step]}
         
-        async def generate_response(state: WarrantyState) -> WarrantyState:
+        async def generate_response(state: WarrantyState) -> Dict[str, Any]:
             """Generate final response."""
-            
-            response_parts = [
-                "## 🛡️ Warranty Claim Processing Complete\n",
-                f"**Claim ID:** {state['claim_id']}",
-                f"**Serial Number:** {state['serial_number']}\n",
+            header = (
+                "## 🛡️ Warranty Claim Processing Complete\n\n"
+                f"**Claim ID:** {state['claim_id']}\n"
+                f"**Serial Number:** {state['serial_number']}\n\n"
                 "### Workflow Executed:"
-            ]
-            
-            for step in state["workflow_steps"]:
-                emoji = "✅" if step["status"] == "complete" else "⏳"
-                response_parts.append(f"{emoji} **{step['label']}**")
+            )
+            workflow_section = "\n".join(
+                f"{_STEP_EMOJI.get(step['status'], '⏳')} **{step['label']}**"
+                for step in state["workflow_steps"]
+            )
             
-            # Warranty verification
-            if state["warranty_info"]:
-                wi = state["warranty_info"]
-                response_parts.append(f"\n### Warranty Verification:")
-                response_parts.append(f"- **Product:** {wi.get('product', 'Unknown')}")
-                response_parts.append(f"- **Valid:** {'✅ Yes' if wi.get('warranty_valid') else '❌ No'}")
-                if wi.get("purchase_date"):
-                    response_parts.append(f"- **Purchase Date:** {wi['purchase_date']}")
-                if wi.get("warranty_end"):
-                    response_parts.append(f"- **Warranty Ends:** {wi['warranty_end']}")
-                response_parts.append(f"- **Previous Claims:** {wi.get('previous_claims', 0)}")
+            warranty_section = ""
+            wi = state["warranty_info"]
+            if wi:
+                warranty_section = "\n".join(filter(None, [
+                    "\n### Warranty Verification:",
+                    f"- **Product:** {wi.get('product', 'Unknown')}",
+                    f"- **Valid:** {'✅ Yes' if wi.get('warranty_valid') else '❌ No'}",
+                    f"- **Purchase Date:** {wi['purchase_date']}" if wi.get("purchase_date") else "",
+                    f"- **Warranty Ends:** {wi['warranty_end']}" if wi.get("warranty_end") else "",
+                    f"- **Previous Claims:** {wi.get('previous_claims', 0)}"
+                ]))
             
-            # Fraud check
-            if state["fraud_check"]:
-                fc = state["fraud_check"]
-                risk_emoji = {"low": "🟢", "medium": "🟡", "high": "🔴"}.get(fc["risk_level"], "⚪")
-                response_parts.append(f"\n### Fraud Analysis:")
-                response_parts.append(f"- **Risk Level:** {risk_emoji} {fc['risk_level'].upper()}")
-                response_parts.append(f"- **Risk Score:** {fc['risk_score']}/100")
-                if fc["fraud_flags"]:
-                    response_parts.append("- **Flags Detected:**")
-                    for flag in fc["fraud_flags"]:
-                        response_parts.append(f"  - ⚠️ {flag['indicator']}: {flag['details']}")
+            fraud_section = ""
+            fc = state["fraud_check"]
+            if fc:
+                risk_emoji = _RISK_EMOJI.get(fc["risk_level"], "⚪")
+                flag_lines = [f"  - ⚠️ {flag['indicator']}: {flag['details']}" for flag in fc["fraud_flags"]]
+                fraud_section = "\n".join([
+                    "\n### Fraud Analysis:",
+                    f"- **Risk Level:** {risk_emoji} {fc['risk_level'].upper()}",
+                    f"- **Risk Score:** {fc['risk_score']}/100",
+                    *(["- **Flags Detected:**", *flag_lines] if flag_lines else [])
+                ])
             
-            # Decision
-            if state["decision"]:
-                d = state["decision"]
-                decision_emoji = {
-                    "approved": "✅",
-                    "approved_with_review": "✅",
-                    "rejected": "❌",
-                    "review_required": "⚠️"
-                }.get(d["decision"], "❓")
-                
-                response_parts.append(f"\n### Final Decision: {decision_emoji} **{d['decision'].upper().replace('_', ' ')}**")
-                response_parts.append(f"- **Reason:** {d['reason']}")
-                response_parts.append(f"- **Action:** {d['action']}")
-                response_parts.append(f"- **Reference:** {d['reference_number']}")
+            decision_section = ""
+            d = state["decision"]
+            if d:
+                decision_emoji = _DECISION_EMOJI.get(d["decision"], "❓")
+                decision_section = (
+                    f"\n### Final Decision: {decision_emoji} **{d['decision'].upper().replace('_', ' ')}**\n"
+                    f"- **Reason:** {d['reason']}\n"
+                    f"- **Action:** {d['action']}\n"
+                    f"- **Reference:** {d['reference_number']}"
+                )
             
-            state["result"] = "\n".join(response_parts)
-            state["messages"].append({"role": "assistant", "content": state["result"]})
+            result = "\n".join(filter(None, [
+                header, workflow_section, warranty_section, fraud_section, decision_section
+            ]))
             
-            return state
+            return {
+                "result": result,
+                "messages": state["messages"] + [{"role": "assistant", "content": result}]
+            }
         
-        async def handle_general_query(state: WarrantyState) -> WarrantyState:
+        async def handle_general_query(state: WarrantyState) -> Dict[str, Any]:
             """Handle general queries."""
             response = await self.llm_service.chat(
                 state["messages"],
                 self.get_system_prompt()
             )
-            state["result"] = response
-            state["messages"].append({"role": "assistant", "content": response})
-            return state
+            return {
+                "result": response,
+                "messages": state["messages"] + [{"role": "assistant", "content": response}]
+            }
         
         def should_process_claim(state: WarrantyState) -> str:
             """Determine if this is a claim to process."""
-            user_message = state["messages"][-1]["content"].lower()
-            claim_keywords = ["claim", "warranty", "serial", "sn-", "process", "broken", "defect", "return"]
-            
-            if any(kw in user_message for kw in claim_keywords):
+            if _is_claim_message(state["messages"][-1]["content"].lower()):
                 return "receive"
             return "general"
         
+        def should_check_fraud(state: WarrantyState) -> str:
+            """Skip the fraud check when the warranty is invalid; the claim is rejected either way."""
+            if (state["warranty_info"] or {}).get("warranty_valid"):
+                return "fraud"
+            return "decide"
+        
         # Build graph
         workflow = StateGraph(WarrantyState)
         
-        workflow.add_node("router", lambda state: state)  # Pass-through router node
-        workflow.add_node("receive", receive_claim)
-        workflow.add_node("extract", extract_data)
-        workflow.add_node("verify", verify_warranty)
-        workflow.add_node("fraud", check_fraud)
-        workflow.add_node("decide", make_decision)
+        workflow.add_node("router", lambda state: {})  # Pass-through router node
+        workflow.add_node("receive", as_node("receive", self._step_receive))
+        workflow.add_node("extract_verify", extract_and_verify)
+        workflow.add_node("fraud", as_node("fraud", self._step_fraud))
+        workflow.add_node("decide", as_node("decide", self._step_decide))
         workflow.add_node("respond", generate_response)
         workflow.add_node("general", handle_general_query)
         
+        # langgraph 0.0.20 has no conditional entry point, so routing goes
+        # through a pass-through node
         workflow.set_entry_point("router")
         workflow.add_conditional_edges(
             "router",
@@ -299,9 +413,15 @@ Known serial numbers in our system:
             }
         )
         
-        workflow.add_edge("receive", "extract")
-        workflow.add_edge("extract", "verify")
-        workflow.add_edge("verify", "fraud")
+        workflow.add_edge("receive", "extract_verify")
+        workflow.add_conditional_edges(
+            "extract_verify",
+            should_check_fraud,
+            {
+                "fraud": "fraud",
+                "decide": "decide"
+            }
+        )
         workflow.add_edge("fraud", "decide")
         workflow.add_edge("decide", "respond")
         workflow.add_edge("respond", END)
@@ -316,24 +436,8 @@ Known serial numbers in our system:
         conversation_history: List[Dict[str, str]] = None
     ) -> Dict[str, Any]:
         """Run the warranty claims workflow."""
-        messages = self._build_messages_with_history(user_input, conversation_history)
-        
-        initial_state: WarrantyState = {
-            "messages": messages,
-            "context": context or {},
-            "current_step": "start",
-            "claim_id": None,
-            "serial_number": None,
-            "receipt_data": None,
-            "warranty_info": None,
-            "fraud_check": None,
-            "decision": None,
-            "workflow_steps": [],
-            "result": None
-        }
-        
-        app = self.graph.compile()
-        final_state = await app.ainvoke(initial_state)
+        initial_state = self._initial_state(user_input, context, conversation_history)
+        final_state = await self._compiled.ainvoke(initial_state)
         
         return {
             "response": final_state.get("result", ""),
@@ -349,16 +453,12 @@ Known serial numbers in our system:
         conversation_history: List[Dict[str, str]] = None
     ):
         """Run the warranty claims workflow with streaming step updates."""
-        import re
-        
         user_message = user_input.lower()
-        claim_keywords = ["claim", "warranty", "serial", "sn-", "process", "broken", "defect", "return"]
-        
-        # Build full messages list for LLM calls
-        messages = self._build_messages_with_history(user_input, conversation_history)
         
         # Check if this is a claim or general query
-        if not any(kw in user_message for kw in claim_keywords):
+        if not _is_claim_message(user_message):
+            # Only general queries go to the LLM, so only they need the full message list
+            messages = self._build_messages_with_history(user_input, conversation_history)
             response = await self.llm_service.chat(
                 messages,
                 self.get_system_prompt()
@@ -366,125 +466,96 @@ Known serial numbers in our system:
             yield {"type": "response", "content": response}
             return
         
-        workflow_steps = []
-        ctx = context or {}
-        
-        # Extract serial number
-        sn_match = re.search(r'SN-\d+', user_input, re.IGNORECASE)
-        if sn_match:
-            serial_number = sn_match.group().upper()
-        elif "12345678" in user_input:
-            serial_number = "SN-12345678"
-        elif "87654321" in user_input:
-            serial_number = "SN-87654321"
-        elif "11111111" in user_input:
-            serial_number = "SN-11111111"
-        else:
-            serial_number = "SN-12345678"
+        state = self._initial_state(user_input, context, conversation_history)
+        
+        # The pipeline runs in its own task so a slow client never stalls it;
+        # this generator only drains the queue
+        queue: asyncio.Queue = asyncio.Queue()
+        producer = asyncio.create_task(self._run_pipeline_into_queue(queue, state))
+        try:
+            while True:
+                item = await queue.get()
+                if item is _SENTINEL:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Client disconnected or pipeline finished; stop any remaining work
+            producer.cancel()
+    
+    async def _run_pipeline_into_queue(self, queue: asyncio.Queue, state: WarrantyState):
+        """Run the claim pipeline, pushing its events (or its error) and then _SENTINEL onto the queue."""
+        try:
+            async for event in self._stream_claim(state):
+                await queue.put(event)
+        except Exception as e:
+            await queue.put(e)
+        finally:
+            await queue.put(_SENTINEL)
+    
+    async def _stream_claim(self, state: WarrantyState):
+        """Run the claim steps, yielding step events and response sections as they complete."""
+        # Step status/result live in lists indexed like _STEPS; step dicts are
+        # only built when an event is sent. `ran` holds the _STEPS positions in
+        # the order they started (fraud may be skipped), which is the client's index.
+        statuses: List[Optional[str]] = [None] * len(_STEPS)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(_STEPS)
+        ran: List[int] = []
+        
+        def step_dict(pos: int) -> Dict[str, Any]:
+            step_id, label = _STEPS[pos]
+            step = {"step": step_id, "status": statuses[pos], "label": label}
+            if results[pos] is not None:
+                step["result"] = results[pos]
+            return step
+        
+        def start(pos: int) -> Dict[str, Any]:
+            ran.append(pos)
+            statuses[pos] = "active"
+            return {"type": "workflow_step", "index": len(ran) - 1, "step": step_dict(pos)}
+        
+        def finish(pos: int, result: Dict[str, Any]) -> Dict[str, Any]:
+            statuses[pos] = "complete"
+            results[pos] = result
+            return {"type": "workflow_step", "index": ran.index(pos), "step": step_dict(pos)}
         
         # Step 1: Receive Claim
-        step1 = {"step": "receive", "status": "active", "label": "Receive Claim"}
-        workflow_steps.append(step1)
-        yield {"type": "workflow_step", "step": step1, "all_steps": workflow_steps.copy()}
-        
-        claim_result = self.tools.receive_claim(serial_number, "Valued Customer", user_input)
-        await asyncio.sleep(STEP_DELAY)
-        
-        workflow_steps[-1]["status"] = "complete"
-        workflow_steps[-1]["result"] = {"claim_id": claim_result["claim_id"]}
-        yield {"type": "workflow_step", "step": workflow_steps[-1], "all_steps": workflow_steps.copy()}
-        
-        # Step 2: Extract Data
-        step2 = {"step": "extract", "status": "active", "label": "Extract Data"}
-        workflow_steps.append(step2)
-        yield {"type": "workflow_step", "step": step2, "all_steps": workflow_steps.copy()}
-        
-        if ctx.get("image_base64"):
-            extracted_text = await self.vision_service.analyze_image(
-                ctx["image_base64"],
-                "Extract all information from this receipt."
-            )
-            receipt_data = {"raw_text": extracted_text, "source": "ocr"}
-        else:
-            result = self.tools.extract_receipt_data("Simulated receipt")
-            await asyncio.sleep(STEP_DELAY)
-            receipt_data = result["extracted_data"]
-        
-        workflow_steps[-1]["status"] = "complete"
-        workflow_steps[-1]["result"] = {"fields_extracted": 6}
-        yield {"type": "workflow_step", "step": workflow_steps[-1], "all_steps": workflow_steps.copy()}
-        
-        # Step 3: Verify Warranty
-        step3 = {"step": "verify", "status": "active", "label": "Verify Warranty"}
-        workflow_steps.append(step3)
-        yield {"type": "workflow_step", "step": step3, "all_steps": workflow_steps.copy()}
-        
-        warranty_info = self.tools.verify_warranty(serial_number)
-        await asyncio.sleep(STEP_DELAY)
-        
-        workflow_steps[-1]["status"] = "complete"
-        workflow_steps[-1]["result"] = {"valid": warranty_info["warranty_valid"]}
-        yield {"type": "workflow_step", "step": workflow_steps[-1], "all_steps": workflow_steps.copy()}
-        
-        # Step 4: Fraud Check
-        step4 = {"step": "fraud", "status": "active", "label": "Fraud Check"}
-        workflow_steps.append(step4)
-        yield {"type": "workflow_step", "step": step4, "all_steps": workflow_steps.copy()}
-        
-        fraud_check = self.tools.check_fraud_indicators(
-            serial_number,
-            warranty_info.get("previous_claims", 0),
-            warranty_info.get("purchase_date")
+        yield start(_RECEIVE)
+        updates, result = await self._step_receive(state)
+        state.update(updates)
+        yield finish(_RECEIVE, result)
+        yield {"type": "response_chunk", "content": self._response_header(state["claim_id"], state["serial_number"])}
+        
+        # Steps 2 & 3: Extract Data and Verify Warranty (run concurrently)
+        yield start(_EXTRACT)
+        yield start(_VERIFY)
+        (extract_updates, extract_result), (verify_updates, verify_result) = await asyncio.gather(
+            self._step_extract(state),
+            self._step_verify(state)
         )
-        await asyncio.sleep(STEP_DELAY)
-        
-        workflow_steps[-1]["status"] = "complete"
-        workflow_steps[-1]["result"] = {"risk_level": fraud_check["risk_level"]}
-        yield {"type": "workflow_step", "step": workflow_steps[-1], "all_steps": workflow_steps.copy()}
+        state.update(extract_updates)
+        state.update(verify_updates)
+        yield finish(_EXTRACT, extract_result)
+        yield finish(_VERIFY, verify_result)
+        yield {"type": "response_chunk", "content": "\n" + self._response_warranty(state["warranty_info"])}
+        
+        # Step 4: Fraud Check (skipped for invalid warranties, which are rejected regardless)
+        if state["warranty_info"]["warranty_valid"]:
+            yield start(_FRAUD)
+            updates, result = await self._step_fraud(state)
+            state.update(updates)
+            yield finish(_FRAUD, result)
+            yield {"type": "response_chunk", "content": "\n" + self._response_fraud(state["fraud_check"])}
         
         # Step 5: Make Decision
-        step5 = {"step": "decide", "status": "active", "label": "Decision"}
-        workflow_steps.append(step5)
-        yield {"type": "workflow_step", "step": step5, "all_steps": workflow_steps.copy()}
-        
-        decision = self.tools.make_decision(
-            claim_result["claim_id"],
-            warranty_info.get("warranty_valid", False),
-            fraud_check.get("risk_level", "low"),
-            user_input
-        )
-        await asyncio.sleep(STEP_DELAY)
-        
-        workflow_steps[-1]["status"] = "complete"
-        workflow_steps[-1]["result"] = {"decision": decision["decision"]}
-        yield {"type": "workflow_step", "step": workflow_steps[-1], "all_steps": workflow_steps.copy()}
-        
-        # Generate response
-        response_parts = [
-            f"## 🛡️ Warranty Claim Processed\n",
-            f"**Claim ID:** {claim_result['claim_id']}\n",
-            f"**Serial Number:** {serial_number}\n"
-        ]
-        
-        response_parts.append("### Workflow Executed:")
-        for step in workflow_steps:
-            emoji = "✅" if step["status"] == "complete" else "⏳"
-            response_parts.append(f"{emoji} **{step['label']}**")
-        
-        response_parts.append(f"\n### Warranty Status:")
-        if warranty_info["warranty_valid"]:
-            response_parts.append(f"✅ Product under warranty until {warranty_info.get('warranty_end')}")
-        else:
-            response_parts.append(f"❌ Warranty expired on {warranty_info.get('warranty_end')}")
-        
-        response_parts.append(f"\n### Fraud Analysis:")
-        risk_emoji = {"low": "🟢", "medium": "🟡", "high": "🔴"}.get(fraud_check["risk_level"], "⚪")
-        response_parts.append(f"- **Risk Level:** {risk_emoji} {fraud_check['risk_level'].upper()}")
-        
-        decision_emoji = {"approved": "✅", "rejected": "❌", "escalated": "⚠️"}.get(decision["decision"], "❓")
-        response_parts.append(f"\n### Final Decision: {decision_emoji} **{decision['decision'].upper()}**")
-        response_parts.append(f"- **Reason:** {decision['reason']}")
-        response_parts.append(f"- **Action:** {decision['action']}")
-        response_parts.append(f"- **Reference:** {decision['reference_number']}")
-        
-        yield {"type": "response", "content": "\n".join(response_parts)}
+        yield start(_DECIDE)
+        updates, result = await self._step_decide(state)
+        state.update(updates)
+        yield finish(_DECIDE, result)
+        yield {"type": "response_chunk", "content": "\n" + self._response_decision(state["decision"])}
+        
+        # Steps are final now, so the executed-workflow summary goes last
+        all_steps = [step_dict(pos) for pos in ran]
+        yield {"type": "response_chunk", "content": "\n" + self._response_workflow(all_steps)}
+        yield {"type": "response_end", "all_steps": all_steps}
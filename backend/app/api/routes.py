@@ -1,10 +1,16 @@
 """API routes for AI Hub."""
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Request, UploadFile, File, Form
+from fastapi.responses import Response, ORJSONResponse
+from sse_starlette.sse import EventSourceResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
-import base64
+from typing import List, Dict, Any, Optional, Tuple
+from functools import lru_cache
+import asyncio
+import hashlib
 import json
+import logging
+import orjson
+import pybase64
 
 from app.agents import (
     PharmaAccountAgent,
@@ -24,30 +30,213 @@ from app.agents import (
     ExpenseClaimAgent,
     TaxiReceiptAgent,
 )
+from app.agents.base_agent import BaseAgent, get_llm_service
 from app.data.mock_data import MockDataStore
-from app.services.llm_service import LLMService
-
-router = APIRouter()
-
-# Initialize agents (lazy loading would be better for production)
-agents = {
-    "pharma_account": PharmaAccountAgent(),
-    "drug_info": DrugInfoAgent(),
-    "automotive_sales": AutomotiveSalesAgent(),
-    "damage_assessment": DamageAssessmentAgent(),
-    "document_processing": DocumentProcessingAgent(),
-    "marketing_content": MarketingContentAgent(),
-    "compliance": ComplianceAgent(),
-    "sales_trainer": SalesTrainerAgent(),
-    "trend_spotter": TrendSpotterAgent(),
-    "warranty_claims": WarrantyClaimsAgent(),
-    "cross_selling": CrossSellingAgent(),
-    "order_fulfillment": OrderFulfillmentAgent(),
-    "voice_analytics": VoiceAnalyticsAgent(),
-    "customer_segmentation": CustomerSegmentationAgent(),
-    "expense_claim": ExpenseClaimAgent(),
-    "taxi_receipt": TaxiReceiptAgent(),
+from app.services.response_cache import ResponseCache
+from app.services.vision_service import VisionService
+from app.config import Settings, get_settings
+
+# Plain-dict responses are rendered with orjson rather than the stdlib json module
+router = APIRouter(default_response_class=ORJSONResponse)
+logger = logging.getLogger(__name__)
+
+# Pre-encoded SSE frames; EventSourceResponse passes bytes through without re-encoding
+_SSE_DONE = b"data: [DONE]\n\n"
+
+
+def _sse(obj: Dict[str, Any]) -> bytes:
+    """Frame an event as a server-sent event."""
+    return b"data: " + orjson.dumps(obj) + b"\n\n"
+
+
+def _event_stream(events) -> EventSourceResponse:
+    """Wrap an SSE frame generator with keep-alive pings and no-buffering headers."""
+    # "\n" separator keeps ping comments in the same line format as our frames
+    return EventSourceResponse(events, ping=get_settings().sse_ping_interval, sep="\n")
+
+
+# Bounds in-flight LLM streams so a burst of clients can't exhaust the upstream
+# connection pool; paired with the settings it was sized from
+_stream_slots: Optional[Tuple[Settings, asyncio.Semaphore]] = None
+
+
+def _stream_semaphore() -> asyncio.Semaphore:
+    """Return the stream limiter, created on first use and rebuilt if the settings are reloaded."""
+    global _stream_slots
+    settings = get_settings()
+    if _stream_slots is None or _stream_slots[0] is not settings:
+        _stream_slots = (settings, asyncio.Semaphore(settings.max_concurrent_streams))
+    return _stream_slots[1]
+
+
+class _BoundedEventSourceResponse(EventSourceResponse):
+    """An SSE response that holds a stream slot, released however the response ends.
+
+    Releasing here rather than in the frame generator also covers responses
+    that fail before the generator is first iterated, e.g. a client that
+    disconnects before the response starts.
+    """
+
+    def __init__(self, slot: asyncio.Semaphore, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.slot = slot
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.slot.release()
+
+
+async def _bounded_event_stream(events) -> EventSourceResponse:
+    """Like _event_stream, but waits briefly for a free stream slot and returns 503 if none frees up."""
+    settings = get_settings()
+    slot = _stream_semaphore()
+    try:
+        await asyncio.wait_for(slot.acquire(), timeout=settings.stream_acquire_timeout)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many concurrent streams, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    return _BoundedEventSourceResponse(slot, events, ping=settings.sse_ping_interval, sep="\n")
+
+
+async def _read_image_base64(image: UploadFile) -> str:
+    """Base64-encode an uploaded image off the event loop, rejecting oversized files."""
+    limit = get_settings().max_upload_bytes
+    if image.size is not None and image.size > limit:
+        raise HTTPException(status_code=413, detail="Image too large")
+    
+    def encode() -> Optional[str]:
+        # Starlette has already spooled the upload (to disk past 1 MB), so read it
+        # straight from that file here instead of buffering a copy on the event loop
+        image.file.seek(0)
+        content = image.file.read(limit + 1)
+        if len(content) > limit:
+            return None
+        return pybase64.b64encode(content).decode("ascii")
+    
+    # Vision calls need a data URL; large uploads are encoded in a worker thread
+    image_base64 = await asyncio.to_thread(encode)
+    if image_base64 is None:
+        raise HTTPException(status_code=413, detail="Image too large")
+    return image_base64
+
+
+@lru_cache(maxsize=64)
+def _etag(body: bytes) -> str:
+    """Strong validator for a response body; repeat calls with the same bytes object hit the cache."""
+    return '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+
+
+def _json_with_etag(request: Request, body: bytes) -> Response:
+    """Serve read-only JSON with cache validators, answering 304 when the client copy is current."""
+    etag = _etag(body)
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=60"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in (t.strip() for t in if_none_match.split(","))):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _parse_history(conversation_history: Optional[str]) -> Optional[List[Dict[str, str]]]:
+    """Parse a form-encoded conversation history, ignoring malformed JSON."""
+    if not conversation_history:
+        return None
+    try:
+        return json.loads(conversation_history)
+    except json.JSONDecodeError:
+        return None
+
+
+async def _stream_agent(
+    agent: BaseAgent,
+    message: str,
+    context: Dict[str, Any],
+    history: Optional[List[Dict[str, str]]] = None
+):
+    """Stream an agent run as SSE frames.
+    
+    Agents without run_with_streaming fall back to a single run(), sent as
+    its workflow steps followed by the response. Errors end the stream
+    with an error event rather than dropping the connection.
+    """
+    try:
+        run_with_streaming = getattr(agent, "run_with_streaming", None)
+        if run_with_streaming is not None:
+            async for event in run_with_streaming(message, context, history):
+                yield _sse(event)
+        else:
+            result = await agent.run(message, context, history)
+            for step in result.get("workflow_steps") or ():
+                yield _sse({'type': 'workflow_step', 'step': step})
+            yield _sse({'type': 'response', 'content': result.get('response', '')})
+        yield _SSE_DONE
+    except Exception as e:
+        logger.exception("Workflow stream failed for agent %s", agent.name)
+        yield _sse({'type': 'error', 'content': str(e)})
+        yield _SSE_DONE
+
+
+# Agent classes by id; instances are created on first use so a worker only
+# builds (graphs, LLM clients) the agents it actually serves
+_AGENT_FACTORIES = {
+    "pharma_account": PharmaAccountAgent,
+    "drug_info": DrugInfoAgent,
+    "automotive_sales": AutomotiveSalesAgent,
+    "damage_assessment": DamageAssessmentAgent,
+    "document_processing": DocumentProcessingAgent,
+    "marketing_content": MarketingContentAgent,
+    "compliance": ComplianceAgent,
+    "sales_trainer": SalesTrainerAgent,
+    "trend_spotter": TrendSpotterAgent,
+    "warranty_claims": WarrantyClaimsAgent,
+    "cross_selling": CrossSellingAgent,
+    "order_fulfillment": OrderFulfillmentAgent,
+    "voice_analytics": VoiceAnalyticsAgent,
+    "customer_segmentation": CustomerSegmentationAgent,
+    "expense_claim": ExpenseClaimAgent,
+    "taxi_receipt": TaxiReceiptAgent,
 }
+agents: Dict[str, BaseAgent] = {}
+
+# Agents whose answers depend only on the request, so /chat may replay them from
+# the response cache. Agents with side effects or randomness (bookings, claims,
+# orders, approvals, practice scenarios) are left out and always run.
+_CACHEABLE_AGENTS = frozenset({
+    "pharma_account",
+    "drug_info",
+    "damage_assessment",
+    "document_processing",
+    "marketing_content",
+    "compliance",
+    "trend_spotter",
+    "cross_selling",
+    "voice_analytics",
+    "customer_segmentation",
+})
+
+
+def _get_agent(agent_id: str) -> Optional[BaseAgent]:
+    """Return the agent for an id, constructing it on first use; None if unknown."""
+    agent = agents.get(agent_id)
+    if agent is None:
+        factory = _AGENT_FACTORIES.get(agent_id)
+        if factory is None:
+            return None
+        # Constructors are synchronous, so no other request can interleave here
+        agent = agents[agent_id] = factory()
+    return agent
+
+
+def _resolve(agent_id: str) -> BaseAgent:
+    """Return the agent for an id, or raise a 404 if there is none."""
+    agent = _get_agent(agent_id)
+    if agent is None:
+        raise HTTPException(status_code=404, detail=f"Agent '{agent_id}' not found")
+    return agent
 
 
 class ChatRequest(BaseModel):
@@ -81,259 +270,229 @@ async def root():
     return {"message": "AI Hub API is running", "version": "1.0.0"}
 
 
+# Agent catalogue is static, so the /agents body is encoded once at import
+_AGENT_LIST = [
+    {
+        "id": "pharma_account",
+        "name": "Pharma Account Sales",
+        "description": "Hospital account info, sales targets, purchase history and FAQ for pharmaceutical salesmen",
+        "icon": "🏥",
+        "category": "Pharmaceutical",
+        "features": ["Account Info", "Sales vs Target", "Purchase History", "FAQ & Policies"]
+    },
+    {
+        "id": "drug_info",
+        "name": "Drug Information & Compliance",
+        "description": "Search drug details, stock levels, and compliance requirements for pharmaceutical products",
+        "icon": "💊",
+        "category": "Pharmaceutical",
+        "features": ["Drug Search", "Stock Inquiry", "Compliance Info", "Clinical Details"]
+    },
+    {
+        "id": "automotive_sales",
+        "name": "Automotive Sales Agent",
+        "description": "End-to-end customer journey for vehicle sales and service",
+        "icon": "🚗",
+        "category": "Automotive",
+        "features": ["Sales Inquiry", "Test Drive Booking", "Financing Options", "Service Scheduling"]
+    },
+    {
+        "id": "damage_assessment",
+        "name": "Vehicle Damage Assessment",
+        "description": "Vision AI for analyzing vehicle damage and repair estimates",
+        "icon": "📸",
+        "category": "Automotive",
+        "features": ["Image Analysis", "Damage Detection", "Cost Estimation", "Service Booking"],
+        "accepts_image": True
+    },
+    {
+        "id": "document_processing",
+        "name": "Document Processing",
+        "description": "Intelligent extraction from shipping documents and invoices",
+        "icon": "📄",
+        "category": "Logistics",
+        "features": ["OCR", "Multilingual", "Data Extraction", "Validation"],
+        "accepts_image": True
+    },
+    {
+        "id": "marketing_content",
+        "name": "Marketing Content Studio",
+        "description": "AI-generated marketing content in multiple languages and styles",
+        "icon": "✨",
+        "category": "Marketing",
+        "features": ["Ad Copy", "Social Media", "Video Scripts", "Localization"]
+    },
+    {
+        "id": "compliance",
+        "name": "Compliance Copilot",
+        "description": "Healthcare regulatory compliance and SOP comparison",
+        "icon": "⚕️",
+        "category": "Healthcare",
+        "features": ["Document Analysis", "Gap Detection", "Risk Assessment", "Action Items"],
+        "accepts_image": True
+    },
+    {
+        "id": "sales_trainer",
+        "name": "Sales Trainer",
+        "description": "Role-play training scenarios for sales staff",
+        "icon": "🎭",
+        "category": "HR & Training",
+        "features": ["Role-Play", "Scenarios", "Scoring", "Feedback"]
+    },
+    {
+        "id": "trend_spotter",
+        "name": "Trend Spotter",
+        "description": "Social media trend analysis and market insights",
+        "icon": "📈",
+        "category": "Marketing",
+        "features": ["Trend Analysis", "Sentiment", "Supplier Matching", "Insights"]
+    },
+    {
+        "id": "warranty_claims",
+        "name": "Warranty Claims",
+        "description": "Automated warranty claim processing with fraud detection",
+        "icon": "🛡️",
+        "category": "Customer Service",
+        "features": ["OCR", "Verification", "Fraud Detection", "Auto-Approval"],
+        "accepts_image": True
+    },
+    {
+        "id": "cross_selling",
+        "name": "Cross-Selling Intelligence",
+        "description": "Smart product recommendations and bundle offers",
+        "icon": "🛒",
+        "category": "Sales",
+        "features": ["Recommendations", "Bundles", "Pricing", "Sales Pitches"]
+    },
+    {
+        "id": "order_fulfillment",
+        "name": "Order Fulfillment Agent",
+        "description": "Agentic order processing and warehouse management",
+        "icon": "📦",
+        "category": "Logistics",
+        "features": ["Order Processing", "Inventory Check", "Route Optimization", "Delivery Tracking"]
+    },
+    {
+        "id": "voice_analytics",
+        "name": "Voice Analytics",
+        "description": "Customer service call analysis with sentiment detection",
+        "icon": "🎙️",
+        "category": "Customer Service",
+        "features": ["Sentiment Analysis", "Call Transcription", "Agent Performance", "Customer Insights"]
+    },
+    {
+        "id": "customer_segmentation",
+        "name": "Customer Segmentation",
+        "description": "ML-powered customer tagging and behavioral segmentation",
+        "icon": "👥",
+        "category": "Analytics",
+        "features": ["RFM Analysis", "Churn Prediction", "Segment Tagging", "LTV Prediction"]
+    },
+    {
+        "id": "expense_claim",
+        "name": "Expense Claim",
+        "description": "Multi-agent expense claim processing with dual approval workflow (Manager → Finance)",
+        "icon": "🧾",
+        "category": "Finance",
+        "features": ["Receipt OCR", "Policy Validation", "Manager Approval", "Finance Approval", "Payment Processing"],
+        "accepts_image": True
+    },
+    {
+        "id": "taxi_receipt",
+        "name": "HK Taxi Receipt",
+        "description": "Specialized agent for Hong Kong taxi receipt claims with auto-approval for small fares",
+        "icon": "🚕",
+        "category": "Finance",
+        "features": ["Taxi OCR", "Fare Validation", "Auto-Approval", "Supervisor Approval", "HK$ Support"],
+        "accepts_image": True
+    },
+]
+_AGENTS_JSON = orjson.dumps({"agents": _AGENT_LIST})
+
+
 @router.get("/agents")
-async def list_agents():
+async def list_agents(request: Request):
     """List all available agents with their metadata."""
-    agent_list = [
-        {
-            "id": "pharma_account",
-            "name": "Pharma Account Sales",
-            "description": "Hospital account info, sales targets, purchase history and FAQ for pharmaceutical salesmen",
-            "icon": "🏥",
-            "category": "Pharmaceutical",
-            "features": ["Account Info", "Sales vs Target", "Purchase History", "FAQ & Policies"]
-        },
-        {
-            "id": "drug_info",
-            "name": "Drug Information & Compliance",
-            "description": "Search drug details, stock levels, and compliance requirements for pharmaceutical products",
-            "icon": "💊",
-            "category": "Pharmaceutical",
-            "features": ["Drug Search", "Stock Inquiry", "Compliance Info", "Clinical Details"]
-        },
-        {
-            "id": "automotive_sales",
-            "name": "Automotive Sales Agent",
-            "description": "End-to-end customer journey for vehicle sales and service",
-            "icon": "🚗",
-            "category": "Automotive",
-            "features": ["Sales Inquiry", "Test Drive Booking", "Financing Options", "Service Scheduling"]
-        },
-        {
-            "id": "damage_assessment",
-            "name": "Vehicle Damage Assessment",
-            "description": "Vision AI for analyzing vehicle damage and repair estimates",
-            "icon": "📸",
-            "category": "Automotive",
-            "features": ["Image Analysis", "Damage Detection", "Cost Estimation", "Service Booking"],
-            "accepts_image": True
-        },
-        {
-            "id": "document_processing",
-            "name": "Document Processing",
-            "description": "Intelligent extraction from shipping documents and invoices",
-            "icon": "📄",
-            "category": "Logistics",
-            "features": ["OCR", "Multilingual", "Data Extraction", "Validation"],
-            "accepts_image": True
-        },
-        {
-            "id": "marketing_content",
-            "name": "Marketing Content Studio",
-            "description": "AI-generated marketing content in multiple languages and styles",
-            "icon": "✨",
-            "category": "Marketing",
-            "features": ["Ad Copy", "Social Media", "Video Scripts", "Localization"]
-        },
-        {
-            "id": "compliance",
-            "name": "Compliance Copilot",
-            "description": "Healthcare regulatory compliance and SOP comparison",
-            "icon": "⚕️",
-            "category": "Healthcare",
-            "features": ["Document Analysis", "Gap Detection", "Risk Assessment", "Action Items"],
-            "accepts_image": True
-        },
-        {
-            "id": "sales_trainer",
-            "name": "Sales Trainer",
-            "description": "Role-play training scenarios for sales staff",
-            "icon": "🎭",
-            "category": "HR & Training",
-            "features": ["Role-Play", "Scenarios", "Scoring", "Feedback"]
-        },
-        {
-            "id": "trend_spotter",
-            "name": "Trend Spotter",
-            "description": "Social media trend analysis and market insights",
-            "icon": "📈",
-            "category": "Marketing",
-            "features": ["Trend Analysis", "Sentiment", "Supplier Matching", "Insights"]
-        },
-        {
-            "id": "warranty_claims",
-            "name": "Warranty Claims",
-            "description": "Automated warranty claim processing with fraud detection",
-            "icon": "🛡️",
-            "category": "Customer Service",
-            "features": ["OCR", "Verification", "Fraud Detection", "Auto-Approval"],
-            "accepts_image": True
-        },
-        {
-            "id": "cross_selling",
-            "name": "Cross-Selling Intelligence",
-            "description": "Smart product recommendations and bundle offers",
-            "icon": "🛒",
-            "category": "Sales",
-            "features": ["Recommendations", "Bundles", "Pricing", "Sales Pitches"]
-        },
-        {
-            "id": "order_fulfillment",
-            "name": "Order Fulfillment Agent",
-            "description": "Agentic order processing and warehouse management",
-            "icon": "📦",
-            "category": "Logistics",
-            "features": ["Order Processing", "Inventory Check", "Route Optimization", "Delivery Tracking"]
-        },
-        {
-            "id": "voice_analytics",
-            "name": "Voice Analytics",
-            "description": "Customer service call analysis with sentiment detection",
-            "icon": "🎙️",
-            "category": "Customer Service",
-            "features": ["Sentiment Analysis", "Call Transcription", "Agent Performance", "Customer Insights"]
-        },
-        {
-            "id": "customer_segmentation",
-            "name": "Customer Segmentation",
-            "description": "ML-powered customer tagging and behavioral segmentation",
-            "icon": "👥",
-            "category": "Analytics",
-            "features": ["RFM Analysis", "Churn Prediction", "Segment Tagging", "LTV Prediction"]
-        },
-        {
-            "id": "expense_claim",
-            "name": "Expense Claim",
-            "description": "Multi-agent expense claim processing with dual approval workflow (Manager → Finance)",
-            "icon": "🧾",
-            "category": "Finance",
-            "features": ["Receipt OCR", "Policy Validation", "Manager Approval", "Finance Approval", "Payment Processing"],
-            "accepts_image": True
-        },
-        {
-            "id": "taxi_receipt",
-            "name": "HK Taxi Receipt",
-            "description": "Specialized agent for Hong Kong taxi receipt claims with auto-approval for small fares",
-            "icon": "🚕",
-            "category": "Finance",
-            "features": ["Taxi OCR", "Fare Validation", "Auto-Approval", "Supervisor Approval", "HK$ Support"],
-            "accepts_image": True
-        },
-    ]
-    return {"agents": agent_list}
+    return _json_with_etag(request, _AGENTS_JSON)
 
 
 @router.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """Chat with a specific agent."""
-    if request.agent_id not in agents:
-        raise HTTPException(status_code=404, detail=f"Agent '{request.agent_id}' not found")
+    agent = _resolve(request.agent_id)
     
-    agent = agents[request.agent_id]
+    async def run_agent():
+        # Run the agent with conversation history
+        return await agent.run(
+            request.message, 
+            request.context or {},
+            request.conversation_history
+        )
     
-    # Run the agent with conversation history
-    result = await agent.run(
-        request.message, 
-        request.context or {},
-        request.conversation_history
-    )
+    if request.agent_id not in _CACHEABLE_AGENTS:
+        result = await run_agent()
+    else:
+        key = ResponseCache.make_key(
+            "chat", request.agent_id, request.message, request.context, request.conversation_history
+        )
+        result = await ResponseCache.get_instance().get_or_call(key, run_agent)
     
-    return ChatResponse(
+    response = ChatResponse(
         response=result["response"],
         agent_id=request.agent_id,
         context=result.get("context"),
         workflow_steps=result.get("workflow_steps")
     )
+    # Serialize in pydantic-core directly; returning the model would re-validate it against response_model
+    return Response(content=response.model_dump_json(), media_type="application/json")
 
 
 @router.post("/chat/stream")
 async def chat_stream(request: ChatRequest):
     """Chat with a specific agent using streaming response."""
-    if request.agent_id not in agents:
-        raise HTTPException(status_code=404, detail=f"Agent '{request.agent_id}' not found")
-    
-    agent = agents[request.agent_id]
+    agent = _resolve(request.agent_id)
     
     # Build full message history including current message
-    messages = list(request.conversation_history or [])
-    messages.append({"role": "user", "content": request.message})
+    messages = [*(request.conversation_history or ()), {"role": "user", "content": request.message}]
+    
+    key = ResponseCache.make_key("chat_stream", request.agent_id, messages)
     
     async def generate():
         """Generate streaming response."""
         try:
-            llm_service = LLMService.get_instance()
-            system_prompt = agent.get_system_prompt()
+            cached = ResponseCache.get_instance().get(key)
+            if cached is not None:
+                # Replay a previously streamed answer as one event
+                yield _sse({'content': cached})
+                yield _SSE_DONE
+                return
             
+            llm_service = get_llm_service()
+            system_prompt = agent.system_prompt
+            
+            chunks = []
             async for chunk in llm_service.chat_stream(messages, system_prompt):
+                chunks.append(chunk)
                 # Send as SSE format
-                yield f"data: {json.dumps({'content': chunk})}\n\n"
+                yield _sse({'content': chunk})
             
-            yield "data: [DONE]\n\n"
+            ResponseCache.get_instance().set(key, "".join(chunks))
+            yield _SSE_DONE
         except Exception as e:
-            # On error, send error message
-            error_msg = f"Error: {str(e)}"
-            yield f"data: {json.dumps({'content': error_msg})}\n\n"
-            yield "data: [DONE]\n\n"
+            # On error, send error message; the traceback goes to the server log
+            logger.exception("Chat stream failed for agent %s", request.agent_id)
+            yield _sse({'content': "Error: " + str(e)})
+            yield _SSE_DONE
     
-    return StreamingResponse(
-        generate(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-        }
-    )
+    return await _bounded_event_stream(generate())
 
 
 @router.post("/chat/workflow-stream")
 async def chat_workflow_stream(request: ChatRequest):
     """Chat with an agent using streaming workflow updates."""
-    if request.agent_id not in agents:
-        raise HTTPException(status_code=404, detail=f"Agent '{request.agent_id}' not found")
-    
-    agent = agents[request.agent_id]
-    conversation_history = request.conversation_history
-    
-    async def generate():
-        """Generate streaming response with workflow updates."""
-        try:
-            # Check if agent supports streaming workflow
-            if hasattr(agent, 'run_with_streaming'):
-                async for event in agent.run_with_streaming(
-                    request.message, 
-                    request.context or {},
-                    conversation_history
-                ):
-                    yield f"data: {json.dumps(event)}\n\n"
-            else:
-                # Fall back to regular run with conversation history
-                result = await agent.run(
-                    request.message, 
-                    request.context or {},
-                    conversation_history
-                )
-                
-                # Send workflow steps one by one with delay simulation
-                if result.get("workflow_steps"):
-                    for step in result["workflow_steps"]:
-                        yield f"data: {json.dumps({'type': 'workflow_step', 'step': step})}\n\n"
-                
-                # Send final response
-                yield f"data: {json.dumps({'type': 'response', 'content': result.get('response', '')})}\n\n"
-            
-            yield "data: [DONE]\n\n"
-        except Exception as e:
-            error_msg = f"Error: {str(e)}"
-            yield f"data: {json.dumps({'type': 'error', 'content': error_msg})}\n\n"
-            yield "data: [DONE]\n\n"
-    
-    return StreamingResponse(
-        generate(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-        }
+    agent = _resolve(request.agent_id)
+    return await _bounded_event_stream(
+        _stream_agent(agent, request.message, request.context or {}, request.conversation_history)
     )
 
 
@@ -345,22 +504,11 @@ async def chat_with_image(
     conversation_history: Optional[str] = Form(None)
 ):
     """Chat with an agent including an image."""
-    if agent_id not in agents:
-        raise HTTPException(status_code=404, detail=f"Agent '{agent_id}' not found")
+    agent = _resolve(agent_id)
     
-    # Read and encode image
-    image_content = await image.read()
-    image_base64 = base64.b64encode(image_content).decode("utf-8")
+    image_base64 = await _read_image_base64(image)
     
-    # Parse conversation history from JSON string
-    history = None
-    if conversation_history:
-        try:
-            history = json.loads(conversation_history)
-        except json.JSONDecodeError:
-            history = None
-    
-    agent = agents[agent_id]
+    history = _parse_history(conversation_history)
     
     # Run agent with image context and conversation history
     context = {"image_base64": image_base64, "mime_type": image.content_type}
@@ -382,59 +530,46 @@ async def chat_with_image_stream(
     conversation_history: Optional[str] = Form(None)
 ):
     """Chat with an agent including an image, with streaming workflow updates."""
-    if agent_id not in agents:
-        raise HTTPException(status_code=404, detail=f"Agent '{agent_id}' not found")
+    agent = _resolve(agent_id)
     
-    # Read and encode image
-    image_content = await image.read()
-    image_base64 = base64.b64encode(image_content).decode("utf-8")
+    image_base64 = await _read_image_base64(image)
     
-    # Parse conversation history from JSON string
-    history = None
-    if conversation_history:
-        try:
-            history = json.loads(conversation_history)
-        except json.JSONDecodeError:
-            history = None
+    history = _parse_history(conversation_history)
     
-    agent = agents[agent_id]
     context = {"image_base64": image_base64, "mime_type": image.content_type}
+    return await _bounded_event_stream(_stream_agent(agent, message, context, history))
+
+
+@router.post("/vision/analyze/stream")
+async def analyze_image_stream(
+    prompt: str = Form(...),
+    image: UploadFile = File(...)
+):
+    """Analyze an image with a prompt, streaming the answer token by token."""
+    image_base64 = await _read_image_base64(image)
+    mime_type = image.content_type or "image/jpeg"
     
     async def generate():
         try:
-            if hasattr(agent, 'run_with_streaming'):
-                async for event in agent.run_with_streaming(message, context, history):
-                    yield f"data: {json.dumps(event)}\n\n"
-            else:
-                # Fallback to regular run with conversation history
-                result = await agent.run(message, context, history)
-                if result.get("workflow_steps"):
-                    for step in result["workflow_steps"]:
-                        yield f"data: {json.dumps({'type': 'workflow_step', 'step': step})}\n\n"
-                yield f"data: {json.dumps({'type': 'response', 'content': result.get('response', '')})}\n\n"
-            
-            yield "data: [DONE]\n\n"
+            async for chunk in VisionService.get_instance().astream_image(image_base64, prompt, mime_type):
+                yield _sse({'content': chunk})
+            yield _SSE_DONE
         except Exception as e:
-            yield f"data: {json.dumps({'type': 'error', 'content': str(e)})}\n\n"
-            yield "data: [DONE]\n\n"
+            logger.exception("Vision stream failed")
+            yield _sse({'content': "Error: " + str(e)})
+            yield _SSE_DONE
     
-    return StreamingResponse(
-        generate(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-        }
-    )
+    return await _bounded_event_stream(generate())
 
 
 @router.post("/order/process")
 async def process_order(request: OrderRequest):
     """Process an order through the fulfillment agent."""
-    agent = agents["order_fulfillment"]
+    agent = _get_agent("order_fulfillment")
     
-    order = {"items": request.items, "customer_id": request.customer_id}
-    result = agent.process_order(order)
+    # Order intake is an in-memory validation, cheap enough to run on the event loop;
+    # the LLM-backed chain is reached through /chat and the workflow stream instead
+    result = agent.tools.receive_order(request.items, request.customer_id)
     
     return result
 
@@ -442,8 +577,9 @@ async def process_order(request: OrderRequest):
 @router.post("/cross-sell/recommend")
 async def get_cross_sell_recommendations(request: CrossSellRequest):
     """Get cross-sell recommendations."""
-    agent = agents["cross_selling"]
+    agent = _get_agent("cross_selling")
     
+    # Pure dictionary lookups over MockDataStore; a thread hop would cost more than the call
     result = agent.get_recommendations(
         request.current_items,
         request.customer_id,
@@ -454,10 +590,10 @@ async def get_cross_sell_recommendations(request: CrossSellRequest):
 
 
 @router.get("/trends/dashboard")
-async def get_trends_dashboard():
+async def get_trends_dashboard(request: Request):
     """Get trend spotter dashboard data."""
-    agent = agents["trend_spotter"]
-    return agent.get_dashboard_data()
+    agent = _get_agent("trend_spotter")
+    return _json_with_etag(request, agent.get_dashboard_bytes())
 
 
 @router.get("/inventory/{sku}")
@@ -466,10 +602,17 @@ async def check_inventory(sku: str):
     return MockDataStore.check_inventory(sku)
 
 
+@lru_cache(maxsize=64)
+def _vehicles_json(brand: Optional[str], data_version: int) -> bytes:
+    """Encode the available vehicles for a brand filter, once per data version."""
+    return orjson.dumps({"vehicles": MockDataStore.get_available_vehicles(brand)})
+
+
 @router.get("/vehicles")
-async def list_vehicles(brand: Optional[str] = None):
+async def list_vehicles(request: Request, brand: Optional[str] = None):
     """List available vehicles."""
-    return {"vehicles": MockDataStore.get_available_vehicles(brand)}
+    brand_key = brand.lower() if brand else None
+    return _json_with_etag(request, _vehicles_json(brand_key, MockDataStore.version))
 
 
 @router.get("/warranty/{serial_number}")
@@ -478,11 +621,16 @@ async def check_warranty(serial_number: str):
     return MockDataStore.check_warranty(serial_number)
 
 
+@lru_cache(maxsize=1)
+def _training_scenarios_json() -> bytes:
+    """Encode the sales trainer's static scenarios once."""
+    return orjson.dumps({"scenarios": SalesTrainerAgent.SCENARIOS})
+
+
 @router.get("/training/scenarios")
-async def list_training_scenarios():
+async def list_training_scenarios(request: Request):
     """List available training scenarios."""
-    agent = agents["sales_trainer"]
-    return {"scenarios": agent.SCENARIOS}
+    return _json_with_etag(request, _training_scenarios_json())
 
 
 class ApprovalRequest(BaseModel):
@@ -495,6 +643,7 @@ async def submit_approval(request: ApprovalRequest):
     """Submit human approval decision for a pending workflow."""
     from app.agents.order_fulfillment_agent import PENDING_APPROVALS
     
+    # Membership only: the entry is consumed when /approval/continue-stream resumes the workflow
     if request.approval_id not in PENDING_APPROVALS:
         raise HTTPException(status_code=404, detail="Approval not found or expired")
     
@@ -508,23 +657,11 @@ async def continue_approval_stream(request: ApprovalRequest):
     approval_id = request.approval_id
     
     if approval_id.startswith("MGR-") or approval_id.startswith("FIN-"):
-        agent = agents["expense_claim"]
+        agent = _get_agent("expense_claim")
     elif approval_id.startswith("TAXI-"):
-        agent = agents["taxi_receipt"]
+        agent = _get_agent("taxi_receipt")
     else:
-        agent = agents["order_fulfillment"]
+        agent = _get_agent("order_fulfillment")
     
-    async def generate():
-        context = {"approval_id": request.approval_id, "approved": request.approved}
-        async for event in agent.run_with_streaming("", context):
-            yield f"data: {json.dumps(event)}\n\n"
-        yield "data: [DONE]\n\n"
-    
-    return StreamingResponse(
-        generate(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-        }
-    )
+    context = {"approval_id": request.approval_id, "approved": request.approved}
+    return _event_stream(_stream_agent(agent, "", context))
@@ -1,31 +1,88 @@
 """Configuration settings for the AI Hub backend."""
+import logging
 import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
 from dotenv import load_dotenv
 
-# Load .env file (for development)
-# Create a .env file in the backend directory with your API key
-load_dotenv()
-
-# OpenRouter Configuration
-# Get API key from environment variable - REQUIRED
-OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
-if not OPENROUTER_API_KEY:
-    print("⚠️  WARNING: OPENROUTER_API_KEY not set. Please create a .env file with your API key.")
-    print("   See .env.example for the required format.")
-OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
-
-# Model Configuration via OpenRouter
-# Primary: Google Gemini 2.0 Flash (fast, works globally)
-DEFAULT_MODEL = "google/gemini-2.0-flash-001"
-VISION_MODEL = "google/gemini-2.0-flash-001"
-
-# Fallback: Same model (or try another available one)
-FALLBACK_MODEL = "google/gemini-2.0-flash-001"
-
-# LLM Provider: "langchain", "openai" (recommended), or "litellm"
-# "openai" uses httpx to call OpenRouter directly - simpler and more reliable
-LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai")
-
-# API Settings
-API_HOST = "0.0.0.0"
-API_PORT = 8000
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Backend settings, resolved once per process by get_settings()."""
+
+    # OpenRouter Configuration
+    # Get API key from environment variable - REQUIRED
+    openrouter_api_key: Optional[str]
+    openrouter_base_url: str = "https://openrouter.ai/api/v1"
+
+    # Model Configuration via OpenRouter
+    # Primary: Google Gemini 2.0 Flash (fast, works globally)
+    default_model: str = "google/gemini-2.0-flash-001"
+    vision_model: str = "google/gemini-2.0-flash-001"
+    # Fallback: Same model (or try another available one)
+    fallback_model: str = "google/gemini-2.0-flash-001"
+
+    # Attempts the OpenAI SDK makes on 408/409/429/5xx and connection errors, with
+    # jittered exponential backoff, before a vision call falls back to fallback_model
+    vision_max_retries: int = 3
+    # Seconds a vision call may stall before the fallback model is raced against it
+    vision_hedge_delay: float = 8.0
+    # Overall budget in seconds for one vision analysis, retries and fallback included
+    vision_call_timeout: float = 120.0
+    # Cache for repeated analyses of the same image and prompt (0 disables it)
+    vision_cache_ttl: int = 3600  # seconds
+    vision_cache_size: int = 512
+
+    # LLM Provider: "langchain", "openai" (recommended), or "litellm"
+    # "openai" uses httpx to call OpenRouter directly - simpler and more reliable
+    llm_provider: str = "openai"
+
+    # Warranty claims: add artificial per-step delays for workflow visualization demos
+    warranty_simulate_delay: bool = False
+
+    # Response cache for repeated identical /chat requests (0 disables it)
+    response_cache_ttl: int = 3600  # seconds
+    response_cache_size: int = 10_000
+
+    # API Settings
+    api_host: str = "0.0.0.0"
+    api_port: int = 8000
+    # Seconds between keep-alive comments on SSE streams, so idle proxies don't drop long agent runs
+    sse_ping_interval: int = 15
+    # Per-worker cap on concurrent streaming requests; extra clients get a 503 after a short wait
+    max_concurrent_streams: int = 32
+    stream_acquire_timeout: float = 0.5  # seconds
+    # Seconds a workflow waits for a human approval decision before it is discarded
+    approval_ttl: int = 900
+    # Largest image accepted by the chat-with-image endpoints
+    max_upload_bytes: int = 20 * 1024 * 1024
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Load settings from the environment on first use.
+
+    Tests can swap settings by patching the environment and calling
+    get_settings.cache_clear().
+    """
+    # Load .env file (for development)
+    # Create a .env file in the backend directory with your API key
+    load_dotenv()
+
+    api_key = os.getenv("OPENROUTER_API_KEY")
+    if not api_key:
+        logger.warning(
+            "OPENROUTER_API_KEY not set. Please create a .env file with your API key "
+            "(see .env.example for the required format)."
+        )
+
+    return Settings(
+        openrouter_api_key=api_key,
+        llm_provider=os.getenv("LLM_PROVIDER", "openai"),
+        warranty_simulate_delay=os.getenv("WARRANTY_SIMULATE_DELAY", "0") == "1",
+        response_cache_ttl=int(os.getenv("RESPONSE_CACHE_TTL", "3600")),
+        max_concurrent_streams=int(os.getenv("MAX_CONCURRENT_STREAMS", "32")),
+    )
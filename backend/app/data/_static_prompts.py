@@ -0,0 +1,8 @@
+"""Pre-rendered prompt sections generated from MockDataStore.
+
+DO NOT EDIT - regenerate with `python scripts/gen_static_prompts.py`.
+"""
+
+TRENDS_CONTEXT = '- Korean Rosé Tteokbokki: 15,420 mentions (+340%) on Instagram - positive sentiment\n- Matcha Desserts: 12,000 mentions (+200%) on TikTok - positive sentiment\n- Oat Milk Coffee: 8,900 mentions (+120%) on Instagram - positive sentiment\n- Plant-Based Meat: 5,600 mentions (+85%) on Facebook - mixed sentiment\n- Japanese Whisky: 4,200 mentions (+65%) on Instagram - positive sentiment'
+
+SUPPLIERS_CONTEXT = '- Seoul Food Co. (korean): Tteokbokki, Kimchi, Gochujang\n- K-Snacks Ltd (korean): Korean Snacks, Rice Cakes\n- Tokyo Imports (japanese): Sake, Matcha, Miso\n- Osaka Foods (japanese): Ramen, Curry, Snacks\n- Green Valley Organics (organic): Oat Milk, Almond Milk'
@@ -1,20 +1,130 @@
 """Mock data store for demo purposes."""
-from typing import Dict, List, Any
-from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Any, Mapping, Optional
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from types import MappingProxyType
+import orjson
 import random
+import re
+import sys
+
+_DATA_DIR = Path(__file__).parent
+
+# Service-type keywords that map to a matching subset of PARTS in get_parts_for_service
+_SERVICE_PART_KEYWORDS = ("brake",)
+# Substring match like `keyword in service_type.lower()`, in one scan for all keywords
+_SERVICE_PART_RE = re.compile("|".join(map(re.escape, _SERVICE_PART_KEYWORDS)), re.IGNORECASE)
+
+
+def _freeze(obj: Any) -> Any:
+    """Recursively convert dicts to read-only mappings and lists to tuples."""
+    if isinstance(obj, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return tuple(_freeze(v) for v in obj)
+    return obj
+
+
+# Shared, read-only cross-sell payloads returned by get_cross_sell_recommendations
+_REC_DAIRY = _freeze({
+    "category": "dairy",
+    "items": ["Organic Oat Milk", "Almond Milk Creamer"],
+    "reason": "Customers who buy beverages often add dairy alternatives"
+})
+_REC_FROZEN = _freeze({
+    "category": "frozen",
+    "items": ["Plant-Based Burger Patties", "Frozen Dumplings"],
+    "reason": "Popular frozen items with high margin"
+})
+
+
+@dataclass(frozen=True)
+class TranscriptEntry:
+    """One line of a call recording transcript."""
+    
+    # Declared by hand rather than dataclass(slots=True) to keep Python 3.9 support
+    __slots__ = ("speaker", "text", "timestamp")
+    
+    speaker: str
+    text: str
+    timestamp: str
+
+
+def _intern_fields(rows: List[Dict[str, Any]], fields: tuple) -> List[Dict[str, Any]]:
+    """Intern categorical string values so repeated labels share one object.
+    
+    The JSON parser creates a new string for every value; literals in this module
+    are already interned by the compiler.
+    """
+    for row in rows:
+        for field in fields:
+            value = row.get(field)
+            if isinstance(value, str):
+                row[field] = sys.intern(value)
+    return rows
+
+
+def _load_call_recordings(calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Store transcript lines as slotted records instead of per-line dicts."""
+    _intern_fields(calls, ("agent", "topic", "resolution"))
+    for call in calls:
+        call["transcript"] = [
+            TranscriptEntry(sys.intern(line["speaker"]), line["text"], line["timestamp"])
+            for line in call.get("transcript", [])
+        ]
+        call["sentiment_journey"] = [sys.intern(s) for s in call.get("sentiment_journey", [])]
+    return calls
+
+
+def _load_customer_behavior(customers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Intern the categorical customer fields used for segmentation."""
+    _intern_fields(customers, ("preferred_channel", "promo_sensitivity", "segment"))
+    for customer in customers:
+        customer["categories_purchased"] = [sys.intern(c) for c in customer.get("categories_purchased", [])]
+    return customers
+
+
+class _LazyJSON:
+    """Class attribute loaded from a JSON file in this package on first access.
+
+    On first read the descriptor replaces itself on the owning class with
+    the parsed data, so later reads are plain attribute lookups.
+    """
+    
+    def __init__(self, filename: str, convert: Optional[Callable[[Any], Any]] = None):
+        self.filename = filename
+        self.convert = convert
+    
+    def __set_name__(self, owner, name: str):
+        self.name = name
+    
+    def __get__(self, instance, owner):
+        value = orjson.loads((_DATA_DIR / self.filename).read_bytes())
+        if self.convert is not None:
+            value = self.convert(value)
+        setattr(owner, self.name, value)
+        return value
 
 
 class MockDataStore:
     """Centralized mock data for all use cases."""
     
+    # Bump whenever the data below is modified at runtime so derived caches refresh
+    version = 0
+    
+    # Lookup indexes derived from the data below, rebuilt lazily after a version bump
+    _indexes: Dict[str, Any] = {}
+    _indexes_version = -1
+    
     # Vehicle Inventory
-    VEHICLES = [
+    VEHICLES = (
         {"id": "V001", "brand": "Toyota", "model": "Camry", "year": 2024, "price": 35000, "color": "Silver", "status": "available"},
         {"id": "V002", "brand": "Honda", "model": "Accord", "year": 2024, "price": 38000, "color": "White", "status": "available"},
         {"id": "V003", "brand": "BMW", "model": "3 Series", "year": 2024, "price": 55000, "color": "Black", "status": "available"},
         {"id": "V004", "brand": "Mercedes", "model": "C-Class", "year": 2024, "price": 58000, "color": "Blue", "status": "reserved"},
         {"id": "V005", "brand": "Lexus", "model": "ES", "year": 2024, "price": 48000, "color": "Pearl White", "status": "available"},
-    ]
+    )
     
     # Service History
     SERVICE_HISTORY = {
@@ -28,7 +138,7 @@ class MockDataStore:
     }
     
     # Parts Inventory
-    PARTS = [
+    PARTS = (
         {"id": "P001", "name": "Brake Pads (Front)", "price": 120, "stock": 45, "compatible": ["Toyota", "Honda", "Lexus"]},
         {"id": "P002", "name": "Brake Pads (Rear)", "price": 100, "stock": 38, "compatible": ["Toyota", "Honda", "Lexus"]},
         {"id": "P003", "name": "Brake Fluid", "price": 25, "stock": 100, "compatible": ["all"]},
@@ -37,30 +147,10 @@ class MockDataStore:
         {"id": "P006", "name": "Oil Filter", "price": 15, "stock": 200, "compatible": ["all"]},
         {"id": "P007", "name": "Air Filter", "price": 35, "stock": 80, "compatible": ["all"]},
         {"id": "P008", "name": "Timing Belt", "price": 250, "stock": 15, "compatible": ["Toyota", "Honda"]},
-    ]
+    )
     
     # Warehouse Inventory
-    WAREHOUSES = {
-        "WH-HK-CENTRAL": {
-            "name": "Hong Kong Central Warehouse",
-            "location": "Central, HK",
-            "inventory": {
-                "SKU001": {"name": "Organic Oat Milk 1L", "quantity": 500, "zone": "A1"},
-                "SKU002": {"name": "Korean Rosé Tteokbokki", "quantity": 200, "zone": "B3"},
-                "SKU003": {"name": "Premium Green Tea", "quantity": 1000, "zone": "A2"},
-                "SKU004": {"name": "Imported Italian Pasta", "quantity": 300, "zone": "C1"},
-            }
-        },
-        "WH-HK-KOWLOON": {
-            "name": "Kowloon Warehouse",
-            "location": "Kowloon, HK",
-            "inventory": {
-                "SKU001": {"name": "Organic Oat Milk 1L", "quantity": 300, "zone": "A1"},
-                "SKU005": {"name": "Plant-Based Burger Patties", "quantity": 150, "zone": "F1"},
-                "SKU006": {"name": "Japanese Sake 720ml", "quantity": 80, "zone": "B2"},
-            }
-        }
-    }
+    WAREHOUSES = _LazyJSON("warehouses.json")
     
     # Customer Profiles
     CUSTOMERS = {
@@ -113,37 +203,16 @@ class MockDataStore:
     }
     
     # Compliance Documents (simulated)
-    COMPLIANCE_SOPS = {
-        "SOP-001": {
-            "title": "Pharmaceutical Storage Guidelines",
-            "version": "2.1",
-            "last_updated": "2024-01-15",
-            "sections": [
-                "Temperature Control: 2-8°C for cold chain items",
-                "Humidity Control: Max 60% RH",
-                "Documentation: Batch tracking required"
-            ]
-        },
-        "SOP-002": {
-            "title": "Import Documentation Requirements",
-            "version": "1.5",
-            "last_updated": "2024-02-20",
-            "sections": [
-                "Certificate of Origin required",
-                "GMP certification for all suppliers",
-                "Customs declaration within 48 hours"
-            ]
-        }
-    }
+    COMPLIANCE_SOPS = _LazyJSON("compliance_sops.json")
     
     # Social Trends Data (simulated)
-    SOCIAL_TRENDS = [
+    SOCIAL_TRENDS = (
         {"trend": "Korean Rosé Tteokbokki", "platform": "Instagram", "mentions": 15420, "growth": "+340%", "sentiment": "positive"},
         {"trend": "Oat Milk Coffee", "platform": "Instagram", "mentions": 8900, "growth": "+120%", "sentiment": "positive"},
         {"trend": "Plant-Based Meat", "platform": "Facebook", "mentions": 5600, "growth": "+85%", "sentiment": "mixed"},
         {"trend": "Japanese Whisky", "platform": "Instagram", "mentions": 4200, "growth": "+65%", "sentiment": "positive"},
         {"trend": "Matcha Desserts", "platform": "TikTok", "mentions": 12000, "growth": "+200%", "sentiment": "positive"},
-    ]
+    )
     
     # Supplier Directory
     SUPPLIERS = {
@@ -161,224 +230,13 @@ class MockDataStore:
     }
     
     # Customer Service Call Recordings (simulated transcripts)
-    CALL_RECORDINGS = [
-        {
-            "id": "CALL-001",
-            "customer_id": "CUS001",
-            "date": "2024-01-15",
-            "duration": "4:32",
-            "agent": "Agent Sarah",
-            "topic": "Product Return",
-            "transcript": [
-                {"speaker": "Agent", "text": "Thank you for calling. My name is Sarah. How can I help you today?", "timestamp": "0:00"},
-                {"speaker": "Customer", "text": "Hi, I received a damaged product yesterday and I want to return it. This is really frustrating.", "timestamp": "0:08"},
-                {"speaker": "Agent", "text": "I'm so sorry to hear that. I completely understand your frustration. Let me help you with that right away.", "timestamp": "0:18"},
-                {"speaker": "Customer", "text": "The package was completely crushed and the item inside is broken.", "timestamp": "0:28"},
-                {"speaker": "Agent", "text": "That's unacceptable. I'll process a full refund and arrange a replacement to be sent today at no extra cost.", "timestamp": "0:36"},
-                {"speaker": "Customer", "text": "Oh, that's great! Thank you so much for being so helpful.", "timestamp": "0:48"},
-                {"speaker": "Agent", "text": "You're welcome. Is there anything else I can help you with?", "timestamp": "0:55"},
-                {"speaker": "Customer", "text": "No, that's all. You've been wonderful. Thank you!", "timestamp": "1:02"}
-            ],
-            "sentiment_score": 0.72,
-            "sentiment_journey": ["negative", "negative", "neutral", "negative", "positive", "positive", "positive", "positive"],
-            "resolution": "resolved",
-            "csat_score": 5
-        },
-        {
-            "id": "CALL-002",
-            "customer_id": "CUS002",
-            "date": "2024-01-16",
-            "duration": "6:15",
-            "agent": "Agent Michael",
-            "topic": "Billing Dispute",
-            "transcript": [
-                {"speaker": "Agent", "text": "Hello, thank you for calling. This is Michael. How may I assist you?", "timestamp": "0:00"},
-                {"speaker": "Customer", "text": "I've been charged twice for my last order! This is the third time this has happened!", "timestamp": "0:10"},
-                {"speaker": "Agent", "text": "I apologize for this inconvenience. Let me look into your account right away.", "timestamp": "0:22"},
-                {"speaker": "Customer", "text": "I'm really fed up with this. I've been a loyal customer for 5 years!", "timestamp": "0:35"},
-                {"speaker": "Agent", "text": "I completely understand, and I value your loyalty. I can see the duplicate charge. Let me process a refund immediately.", "timestamp": "0:48"},
-                {"speaker": "Customer", "text": "How long will the refund take? I need that money back.", "timestamp": "1:05"},
-                {"speaker": "Agent", "text": "The refund will be processed within 24 hours. I'm also adding a $20 credit to your account for the inconvenience.", "timestamp": "1:15"},
-                {"speaker": "Customer", "text": "Well, I appreciate that. But please make sure this doesn't happen again.", "timestamp": "1:30"},
-                {"speaker": "Agent", "text": "Absolutely. I've flagged your account and will personally follow up. You have my direct extension.", "timestamp": "1:42"}
-            ],
-            "sentiment_score": 0.35,
-            "sentiment_journey": ["neutral", "very_negative", "neutral", "very_negative", "neutral", "negative", "positive", "neutral", "positive"],
-            "resolution": "resolved",
-            "csat_score": 3
-        },
-        {
-            "id": "CALL-003",
-            "customer_id": "CUS003",
-            "date": "2024-01-17",
-            "duration": "3:45",
-            "agent": "Agent Lisa",
-            "topic": "Product Inquiry",
-            "transcript": [
-                {"speaker": "Agent", "text": "Good morning! Thank you for calling. I'm Lisa. How can I make your day better?", "timestamp": "0:00"},
-                {"speaker": "Customer", "text": "Hi Lisa! I'm interested in the new Korean snack collection. Can you tell me more about it?", "timestamp": "0:12"},
-                {"speaker": "Agent", "text": "Absolutely! We have an exciting new range of authentic Korean snacks. Are you a fan of spicy or sweet flavors?", "timestamp": "0:24"},
-                {"speaker": "Customer", "text": "I love spicy! What do you recommend?", "timestamp": "0:38"},
-                {"speaker": "Agent", "text": "The Honey Butter Chips and Spicy Tteokbokki Snacks are our bestsellers. They're flying off the shelves!", "timestamp": "0:48"},
-                {"speaker": "Customer", "text": "That sounds amazing! I'll order both. You've been super helpful!", "timestamp": "1:02"},
-                {"speaker": "Agent", "text": "Thank you! I'll add a sample pack of our new Matcha cookies as a gift. Enjoy!", "timestamp": "1:12"}
-            ],
-            "sentiment_score": 0.92,
-            "sentiment_journey": ["positive", "positive", "positive", "positive", "positive", "very_positive", "very_positive"],
-            "resolution": "sale_completed",
-            "csat_score": 5
-        },
-        {
-            "id": "CALL-004",
-            "customer_id": "CUS004",
-            "date": "2024-01-18",
-            "duration": "8:20",
-            "agent": "Agent David",
-            "topic": "Service Cancellation",
-            "transcript": [
-                {"speaker": "Agent", "text": "Thank you for calling. This is David. How can I help you today?", "timestamp": "0:00"},
-                {"speaker": "Customer", "text": "I want to cancel my subscription. I'm done with this service.", "timestamp": "0:10"},
-                {"speaker": "Agent", "text": "I'm sorry to hear that. May I ask what prompted this decision?", "timestamp": "0:20"},
-                {"speaker": "Customer", "text": "The prices keep going up and the quality has dropped. I found a better alternative.", "timestamp": "0:32"},
-                {"speaker": "Agent", "text": "I appreciate your honest feedback. We've actually just launched improved products. Would you consider staying if I offered you 30% off for 6 months?", "timestamp": "0:48"},
-                {"speaker": "Customer", "text": "That's a significant discount... but I'm not sure.", "timestamp": "1:05"},
-                {"speaker": "Agent", "text": "I understand. How about I also include free premium delivery? That's a $60 annual value.", "timestamp": "1:18"},
-                {"speaker": "Customer", "text": "Okay, that does sound like a good deal. I'll give it another try.", "timestamp": "1:35"},
-                {"speaker": "Agent", "text": "Wonderful! I'll apply the discount immediately. Welcome back!", "timestamp": "1:48"}
-            ],
-            "sentiment_score": 0.48,
-            "sentiment_journey": ["neutral", "negative", "neutral", "negative", "neutral", "neutral", "neutral", "positive", "positive"],
-            "resolution": "retention_successful",
-            "csat_score": 4
-        }
-    ]
+    CALL_RECORDINGS = _LazyJSON("call_recordings.json", _load_call_recordings)
     
     # Customer Behavior Data for Segmentation
-    CUSTOMER_BEHAVIOR = [
-        {
-            "customer_id": "CUS-A001",
-            "name": "Alice Chan",
-            "registration_date": "2022-03-15",
-            "total_orders": 45,
-            "total_spend": 12500,
-            "avg_order_value": 277.78,
-            "order_frequency_days": 8,
-            "last_order_date": "2024-01-10",
-            "categories_purchased": ["beverages", "organic", "imported", "snacks"],
-            "favorite_brands": ["Green Valley", "Tokyo Imports"],
-            "preferred_channel": "mobile_app",
-            "email_open_rate": 0.65,
-            "promo_sensitivity": "low",
-            "returns_count": 1,
-            "review_count": 12,
-            "avg_rating_given": 4.5,
-            "segment": "VIP",
-            "predicted_ltv": 25000
-        },
-        {
-            "customer_id": "CUS-A002",
-            "name": "Bob Liu",
-            "registration_date": "2023-06-20",
-            "total_orders": 8,
-            "total_spend": 890,
-            "avg_order_value": 111.25,
-            "order_frequency_days": 28,
-            "last_order_date": "2024-01-05",
-            "categories_purchased": ["beverages", "snacks"],
-            "favorite_brands": ["K-Snacks"],
-            "preferred_channel": "website",
-            "email_open_rate": 0.25,
-            "promo_sensitivity": "high",
-            "returns_count": 0,
-            "review_count": 2,
-            "avg_rating_given": 4.0,
-            "segment": "Regular",
-            "predicted_ltv": 2500
-        },
-        {
-            "customer_id": "CUS-A003",
-            "name": "Carol Wong",
-            "registration_date": "2021-11-01",
-            "total_orders": 120,
-            "total_spend": 45000,
-            "avg_order_value": 375.00,
-            "order_frequency_days": 5,
-            "last_order_date": "2024-01-15",
-            "categories_purchased": ["beverages", "organic", "imported", "frozen", "premium", "snacks"],
-            "favorite_brands": ["Green Valley", "Tokyo Imports", "Seoul Food"],
-            "preferred_channel": "mobile_app",
-            "email_open_rate": 0.85,
-            "promo_sensitivity": "low",
-            "returns_count": 2,
-            "review_count": 35,
-            "avg_rating_given": 4.8,
-            "segment": "Champion",
-            "predicted_ltv": 85000
-        },
-        {
-            "customer_id": "CUS-A004",
-            "name": "David Ng",
-            "registration_date": "2023-01-15",
-            "total_orders": 3,
-            "total_spend": 250,
-            "avg_order_value": 83.33,
-            "order_frequency_days": 90,
-            "last_order_date": "2023-10-20",
-            "categories_purchased": ["snacks"],
-            "favorite_brands": [],
-            "preferred_channel": "website",
-            "email_open_rate": 0.10,
-            "promo_sensitivity": "high",
-            "returns_count": 1,
-            "review_count": 0,
-            "avg_rating_given": 0,
-            "segment": "At Risk",
-            "predicted_ltv": 500
-        },
-        {
-            "customer_id": "CUS-A005",
-            "name": "Emily Lam",
-            "registration_date": "2023-09-01",
-            "total_orders": 15,
-            "total_spend": 3200,
-            "avg_order_value": 213.33,
-            "order_frequency_days": 12,
-            "last_order_date": "2024-01-12",
-            "categories_purchased": ["organic", "beverages", "imported"],
-            "favorite_brands": ["Green Valley"],
-            "preferred_channel": "mobile_app",
-            "email_open_rate": 0.55,
-            "promo_sensitivity": "medium",
-            "returns_count": 0,
-            "review_count": 5,
-            "avg_rating_given": 4.2,
-            "segment": "Growing",
-            "predicted_ltv": 12000
-        },
-        {
-            "customer_id": "CUS-A006",
-            "name": "Frank Ho",
-            "registration_date": "2022-07-10",
-            "total_orders": 25,
-            "total_spend": 4800,
-            "avg_order_value": 192.00,
-            "order_frequency_days": 18,
-            "last_order_date": "2023-12-01",
-            "categories_purchased": ["frozen", "beverages", "snacks"],
-            "favorite_brands": ["Osaka Foods"],
-            "preferred_channel": "website",
-            "email_open_rate": 0.35,
-            "promo_sensitivity": "medium",
-            "returns_count": 3,
-            "review_count": 8,
-            "avg_rating_given": 3.5,
-            "segment": "Declining",
-            "predicted_ltv": 6000
-        }
-    ]
+    CUSTOMER_BEHAVIOR = _LazyJSON("customer_behavior.json", _load_customer_behavior)
     
     # Expense Claims Sample Data
-    EXPENSE_CLAIMS = [
+    EXPENSE_CLAIMS = (
         {
             "claim_id": "EXP-001",
             "employee": "John Wong",
@@ -459,19 +317,21 @@ class MockDataStore:
             "payment_status": "on_hold",
             "payment_ref": None
         }
-    ]
+    )
     
     # Expense Policies
-    EXPENSE_POLICIES = {
+    # Read-only: handed out by reference through get_expense_policies()
+    EXPENSE_POLICIES = _freeze({
         "meals": {"daily_limit": 500, "requires_receipt": True, "auto_approve_under": 200},
         "travel": {"daily_limit": 2000, "requires_receipt": True, "auto_approve_under": 300},
         "accommodation": {"daily_limit": 1500, "requires_receipt": True, "auto_approve_under": 0},
         "office_supplies": {"daily_limit": 1000, "requires_receipt": True, "auto_approve_under": 200},
         "entertainment": {"daily_limit": 800, "requires_receipt": True, "auto_approve_under": 0}
-    }
+    })
     
     # Segment Definitions
-    CUSTOMER_SEGMENTS = {
+    # Read-only: segment definitions are shared by every segmentation result
+    CUSTOMER_SEGMENTS = _freeze({
         "Champion": {
             "description": "Best customers who buy frequently and spend the most",
             "criteria": "High frequency, high spend, high engagement",
@@ -508,30 +368,58 @@ class MockDataStore:
             "recommended_actions": ["Retention offers", "Personal outreach", "Exit surveys"],
             "color": "#EF4444"
         }
-    }
+    })
+    
+    @classmethod
+    def _index(cls, name: str, build: Callable[[], Any]) -> Any:
+        """Return a named lookup index, building it on first use for the current data version."""
+        if cls._indexes_version != cls.version:
+            cls._indexes = {}
+            cls._indexes_version = cls.version
+        index = cls._indexes.get(name)
+        if index is None:
+            index = cls._indexes[name] = build()
+        return index
     
     @classmethod
     def get_vehicle_by_id(cls, vehicle_id: str) -> Dict[str, Any]:
         """Get vehicle by ID."""
-        for v in cls.VEHICLES:
-            if v["id"] == vehicle_id:
-                return v
-        return {}
+        by_id = cls._index("vehicle_by_id", lambda: {v["id"]: v for v in cls.VEHICLES})
+        return by_id.get(vehicle_id, {})
     
     @classmethod
     def get_available_vehicles(cls, brand: str = None) -> List[Dict[str, Any]]:
         """Get available vehicles, optionally filtered by brand."""
-        vehicles = [v for v in cls.VEHICLES if v["status"] == "available"]
-        if brand:
-            vehicles = [v for v in vehicles if v["brand"].lower() == brand.lower()]
-        return vehicles
+        # Copies keep callers from mutating the index
+        return list(cls.iter_available_vehicles(brand))
+    
+    @classmethod
+    def iter_available_vehicles(cls, brand: str = None) -> Iterator[Dict[str, Any]]:
+        """Iterate available vehicles without building a list, optionally filtered by brand."""
+        by_brand = cls._index("available_by_brand", cls._build_available_by_brand)
+        # Key None holds every available vehicle
+        yield from by_brand.get(brand.lower() if brand else None, ())
+    
+    @classmethod
+    def _build_available_by_brand(cls) -> Dict[Any, List[Dict[str, Any]]]:
+        """Group available vehicles by lowercased brand, plus all of them under None."""
+        by_brand: Dict[Any, List[Dict[str, Any]]] = {None: []}
+        for v in cls.VEHICLES:
+            if v["status"] == "available":
+                by_brand[None].append(v)
+                by_brand.setdefault(v["brand"].lower(), []).append(v)
+        return by_brand
     
     @classmethod
     def get_parts_for_service(cls, service_type: str) -> List[Dict[str, Any]]:
         """Get related parts for a service type."""
-        if "brake" in service_type.lower():
-            return [p for p in cls.PARTS if "brake" in p["name"].lower()]
-        return cls.PARTS[:3]
+        parts_by_keyword = cls._index("parts_by_keyword", lambda: {
+            keyword: [p for p in cls.PARTS if keyword in p["name"].lower()] for keyword in _SERVICE_PART_KEYWORDS
+        })
+        match = _SERVICE_PART_RE.search(service_type)
+        if match:
+            return list(parts_by_keyword[match.group().lower()])
+        return list(cls.PARTS[:3])
     
     @classmethod
     def check_warranty(cls, serial_number: str) -> Dict[str, Any]:
@@ -540,8 +428,11 @@ class MockDataStore:
         if not record:
             return {"valid": False, "message": "Serial number not found"}
         
-        warranty_end = datetime.strptime(record["warranty_end"], "%Y-%m-%d")
-        is_valid = warranty_end > datetime.now()
+        # Day ordinals: ending at midnight of warranty_end, valid only while today is earlier
+        warranty_ends = cls._index("warranty_end_ordinal", lambda: {
+            sn: date.fromisoformat(r["warranty_end"]).toordinal() for sn, r in cls.WARRANTY_RECORDS.items()
+        })
+        is_valid = warranty_ends[serial_number] > date.today().toordinal()
         
         return {
             "valid": is_valid,
@@ -554,46 +445,60 @@ class MockDataStore:
     @classmethod
     def get_trending_items(cls, limit: int = 5) -> List[Dict[str, Any]]:
         """Get trending items from social data."""
-        return sorted(cls.SOCIAL_TRENDS, key=lambda x: x["mentions"], reverse=True)[:limit]
+        ranked = cls._index("trends_by_mentions", lambda: sorted(
+            cls.SOCIAL_TRENDS, key=lambda x: x["mentions"], reverse=True
+        ))
+        return ranked[:limit]
     
     @classmethod
     def find_suppliers(cls, category: str) -> List[Dict[str, Any]]:
         """Find suppliers by category."""
-        return cls.SUPPLIERS.get(category.lower(), [])
+        # Keys are lowercase, so the common already-lowercase call skips the lower() copy
+        suppliers = cls.SUPPLIERS.get(category)
+        if suppliers is None:
+            suppliers = cls.SUPPLIERS.get(category.lower(), [])
+        return suppliers
     
     @classmethod
     def check_inventory(cls, sku: str) -> Dict[str, Any]:
         """Check inventory across all warehouses."""
-        result = {"sku": sku, "warehouses": []}
+        by_sku = cls._index("inventory_by_sku", cls._build_inventory_by_sku)
+        return {"sku": sku, "warehouses": list(by_sku.get(sku, ()))}
+    
+    @classmethod
+    def total_stock(cls, sku: str) -> int:
+        """Total quantity of a SKU across all warehouses."""
+        totals = cls._index("stock_by_sku", lambda: {
+            sku: sum(entry["quantity"] for entry in entries)
+            for sku, entries in cls._index("inventory_by_sku", cls._build_inventory_by_sku).items()
+        })
+        return totals.get(sku, 0)
+    
+    @classmethod
+    def _build_inventory_by_sku(cls) -> Dict[str, List[Dict[str, Any]]]:
+        """Map each SKU to its stock entries across warehouses, in warehouse order."""
+        by_sku: Dict[str, List[Dict[str, Any]]] = {}
         for wh_id, wh_data in cls.WAREHOUSES.items():
-            if sku in wh_data["inventory"]:
-                item = wh_data["inventory"][sku]
-                result["warehouses"].append({
+            for sku, item in wh_data["inventory"].items():
+                by_sku.setdefault(sku, []).append({
                     "warehouse_id": wh_id,
                     "name": wh_data["name"],
                     "quantity": item["quantity"],
                     "zone": item["zone"]
                 })
-        return result
+        return by_sku
     
     @classmethod
     def get_cross_sell_recommendations(cls, current_purchases: List[str], customer_id: str = None) -> List[Dict[str, Any]]:
         """Get cross-sell recommendations based on purchase history."""
+        purchases = set(current_purchases)
         recommendations = []
         
-        if "beverages" in current_purchases and "dairy" not in current_purchases:
-            recommendations.append({
-                "category": "dairy",
-                "items": ["Organic Oat Milk", "Almond Milk Creamer"],
-                "reason": "Customers who buy beverages often add dairy alternatives"
-            })
+        if "beverages" in purchases and "dairy" not in purchases:
+            recommendations.append(_REC_DAIRY)
         
-        if "frozen" not in current_purchases:
-            recommendations.append({
-                "category": "frozen",
-                "items": ["Plant-Based Burger Patties", "Frozen Dumplings"],
-                "reason": "Popular frozen items with high margin"
-            })
+        if "frozen" not in purchases:
+            recommendations.append(_REC_FROZEN)
         
         return recommendations
     
@@ -601,37 +506,79 @@ class MockDataStore:
     def get_call_recordings(cls, call_id: str = None) -> List[Dict[str, Any]]:
         """Get call recordings, optionally filtered by ID."""
         if call_id:
-            for call in cls.CALL_RECORDINGS:
-                if call["id"] == call_id:
-                    return [call]
-            return []
+            by_id = cls._index("call_by_id", lambda: {c["id"]: c for c in cls.CALL_RECORDINGS})
+            call = by_id.get(call_id)
+            return [call] if call is not None else []
         return cls.CALL_RECORDINGS
     
+    @classmethod
+    def iter_call_recordings(cls, call_id: str = None) -> Iterator[Dict[str, Any]]:
+        """Iterate call recordings without building a list, optionally filtered by ID."""
+        yield from cls.get_call_recordings(call_id)
+    
     @classmethod
     def get_customer_behavior(cls, customer_id: str = None, segment: str = None) -> List[Dict[str, Any]]:
         """Get customer behavior data, optionally filtered."""
-        customers = cls.CUSTOMER_BEHAVIOR
         if customer_id:
-            customers = [c for c in customers if c["customer_id"] == customer_id]
+            by_id = cls._index("customer_by_id", lambda: {c["customer_id"]: c for c in cls.CUSTOMER_BEHAVIOR})
+            customer = by_id.get(customer_id)
+            if customer is None or (segment and customer["segment"].lower() != segment.lower()):
+                return []
+            return [customer]
         if segment:
-            customers = [c for c in customers if c["segment"].lower() == segment.lower()]
-        return customers
+            by_segment = cls._index("customers_by_segment", cls._build_customers_by_segment)
+            return list(by_segment.get(segment.lower(), ()))
+        return cls.CUSTOMER_BEHAVIOR
+    
+    @classmethod
+    def iter_customer_behavior(cls, customer_id: str = None, segment: str = None) -> Iterator[Dict[str, Any]]:
+        """Iterate customer behavior data without building a list, optionally filtered."""
+        if segment and not customer_id:
+            by_segment = cls._index("customers_by_segment", cls._build_customers_by_segment)
+            yield from by_segment.get(segment.lower(), ())
+        else:
+            yield from cls.get_customer_behavior(customer_id, segment)
+    
+    @classmethod
+    def _build_customers_by_segment(cls) -> Dict[str, List[Dict[str, Any]]]:
+        """Group customers by lowercased segment name."""
+        by_segment: Dict[str, List[Dict[str, Any]]] = {}
+        for c in cls.CUSTOMER_BEHAVIOR:
+            by_segment.setdefault(c["segment"].lower(), []).append(c)
+        return by_segment
+    
+    @classmethod
+    def get_customer_column(cls, field: str) -> tuple:
+        """Get one CUSTOMER_BEHAVIOR field for every customer, in row order."""
+        return cls._index("customer_columns", cls._build_customer_columns)[field]
+    
+    @classmethod
+    def _build_customer_columns(cls) -> Dict[str, tuple]:
+        """Transpose CUSTOMER_BEHAVIOR into one tuple per field for column scans."""
+        rows = cls.CUSTOMER_BEHAVIOR
+        fields = rows[0].keys() if rows else ()
+        return {field: tuple(row[field] for row in rows) for field in fields}
     
     @classmethod
     def get_segment_info(cls, segment_name: str = None) -> Dict[str, Any]:
         """Get segment definitions."""
         if segment_name:
-            return cls.CUSTOMER_SEGMENTS.get(segment_name, {})
+            by_name = cls._index("segments_by_lower_name", lambda: {
+                name.lower(): info for name, info in cls.CUSTOMER_SEGMENTS.items()
+            })
+            return by_name.get(segment_name.lower(), {})
         return cls.CUSTOMER_SEGMENTS
     
     @classmethod
     def get_expense_claims(cls, status: str = None, employee: str = None) -> List[Dict[str, Any]]:
         """Get expense claims, optionally filtered."""
-        claims = cls.EXPENSE_CLAIMS
+        # Always a fresh list; EXPENSE_CLAIMS itself is an immutable tuple
+        claims = list(cls.EXPENSE_CLAIMS)
         if status:
             claims = [c for c in claims if c.get("payment_status") == status]
         if employee:
-            claims = [c for c in claims if c.get("employee", "").lower() == employee.lower()]
+            employee = employee.lower()
+            claims = [c for c in claims if c.get("employee", "").lower() == employee]
         return claims
     
     @classmethod
@@ -640,9 +587,10 @@ class MockDataStore:
         return cls.EXPENSE_POLICIES
     
     @classmethod
-    def get_all_sample_data(cls) -> Dict[str, Any]:
+    def get_all_sample_data(cls) -> Mapping[str, Any]:
         """Get all sample data for display."""
-        return {
+        # One read-only view per data version; it references the datasets rather than copying them
+        return cls._index("all_sample_data", lambda: MappingProxyType({
             "vehicles": cls.VEHICLES,
             "warehouses": cls.WAREHOUSES,
             "customers": cls.CUSTOMERS,
@@ -656,5 +604,5 @@ class MockDataStore:
             "customer_segments": cls.CUSTOMER_SEGMENTS,
             "expense_claims": cls.EXPENSE_CLAIMS,
             "expense_policies": cls.EXPENSE_POLICIES
-        }
+        }))
 
@@ -1,15 +1,48 @@
 """Main FastAPI application for AI Hub."""
+import logging
+import queue
+from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import router
-from app.config import API_HOST, API_PORT
+from app.config import get_settings
+from app.services.openai_service import OpenAIService
+from app.services.vision_service import VisionService
+
+# App loggers only enqueue records; a listener thread writes them, so a slow
+# stderr never blocks the event loop
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter("%(levelname)s:  %(name)s: %(message)s"))
+_log_listener = QueueListener(_log_queue, _log_handler)
+_app_logger = logging.getLogger("app")
+_app_logger.addHandler(QueueHandler(_log_queue))
+_app_logger.setLevel(logging.INFO)
+_app_logger.propagate = False
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Set up shared services before serving and release them when the worker stops."""
+    _log_listener.start()
+    # Build the vision clients up front, so the first image request doesn't pay for them
+    VisionService.get_instance()
+    try:
+        yield
+    finally:
+        await OpenAIService.aclose()
+        await VisionService.aclose()
+        _log_listener.stop()
+
 
 app = FastAPI(
     title="AI Hub API",
     description="Backend API for AI Hub demo showcasing various AI use cases",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Configure CORS for frontend
@@ -32,6 +65,17 @@ async def health_check():
 
 
 if __name__ == "__main__":
+    import sys
     import uvicorn
-    uvicorn.run("app.main:app", host=API_HOST, port=API_PORT, reload=True)
+    settings = get_settings()
+    uvicorn.run(
+        "app.main:app",
+        host=settings.api_host,
+        port=settings.api_port,
+        reload=True,
+        # uvloop has no Windows build; elsewhere it and httptools are required
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        ws="none",
+    )
 
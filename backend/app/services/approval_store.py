@@ -0,0 +1,41 @@
+"""Bounded in-process store for workflows paused on a human approval."""
+from typing import Any, Dict, Optional
+import threading
+from cachetools import TTLCache
+from app.config import get_settings
+
+
+class ApprovalStore:
+    """Pending approvals keyed by approval ID, expiring after a TTL.
+
+    Entries are consumed with pop(), so a decision can only resume a
+    workflow once. Abandoned approvals expire instead of accumulating.
+    State is per worker process; a multi-worker deployment would need a
+    shared backend such as Redis.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: Optional[int] = None):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._pending: Optional[TTLCache] = None
+        self._lock = threading.Lock()
+
+    def _cache(self) -> TTLCache:
+        # Created on first use so importing an agent module doesn't load settings
+        if self._pending is None:
+            ttl = get_settings().approval_ttl if self._ttl is None else self._ttl
+            self._pending = TTLCache(maxsize=self._maxsize, ttl=ttl)
+        return self._pending
+
+    def __setitem__(self, approval_id: str, data: Dict[str, Any]):
+        with self._lock:
+            self._cache()[approval_id] = data
+
+    def __contains__(self, approval_id: str) -> bool:
+        with self._lock:
+            return approval_id in self._cache()
+
+    def pop(self, approval_id: str) -> Optional[Dict[str, Any]]:
+        """Remove and return a pending approval, or None if it is unknown or expired."""
+        with self._lock:
+            return self._cache().pop(approval_id, None)
@@ -1,27 +1,48 @@
 """Image Generation Service using OpenRouter."""
 import httpx
+import re
+import threading
+from functools import lru_cache
 from typing import Optional, Dict, Any
-from app.config import OPENROUTER_API_KEY, OPENROUTER_BASE_URL
+
+# Sample generated image URLs for demo (since actual generation may be slow)
+DEMO_IMAGES = {
+    "car": "https://images.unsplash.com/photo-1494976388531-d1058494cdd8?w=800",
+    "food": "https://images.unsplash.com/photo-1504674900247-0877df9cc836?w=800",
+    "product": "https://images.unsplash.com/photo-1523275335684-37898b6baf30?w=800",
+    "sale": "https://images.unsplash.com/photo-1607083206869-4c7672e72a8a?w=800",
+    "luxury": "https://images.unsplash.com/photo-1549399542-7e3f8b79c341?w=800",
+    "technology": "https://images.unsplash.com/photo-1518770660439-4636190af475?w=800",
+    "health": "https://images.unsplash.com/photo-1505576399279-565b52d4ac71?w=800",
+    "organic": "https://images.unsplash.com/photo-1542838132-92c53300491e?w=800",
+    "korean": "https://images.unsplash.com/photo-1617093727343-374698b1b08d?w=800",
+    "default": "https://images.unsplash.com/photo-1557804506-669a67965ba0?w=800",
+}
+
+# Every keyword occurrence in one pass; the lookahead also reports overlapping matches
+_DEMO_IMAGE_RE = re.compile("(?=(%s))" % "|".join(map(re.escape, DEMO_IMAGES)))
+# Earlier keywords win, as in the original dict-order scan
+_DEMO_IMAGE_PRIORITY = {keyword: i for i, keyword in enumerate(DEMO_IMAGES)}
+
+
+@lru_cache(maxsize=1024)
+def _lookup_demo_image(prompt_lower: str) -> str:
+    """Map a lowercased prompt to its demo image URL; briefs repeat product names often."""
+    keyword = min(
+        (m.group(1) for m in _DEMO_IMAGE_RE.finditer(prompt_lower)),
+        key=_DEMO_IMAGE_PRIORITY.__getitem__,
+        default="default",
+    )
+    return DEMO_IMAGES[keyword]
 
 
 class ImageService:
     """Service for generating images via AI."""
     
     _instance: Optional["ImageService"] = None
+    _lock = threading.Lock()
     
-    # Sample generated image URLs for demo (since actual generation may be slow)
-    DEMO_IMAGES = {
-        "car": "https://images.unsplash.com/photo-1494976388531-d1058494cdd8?w=800",
-        "food": "https://images.unsplash.com/photo-1504674900247-0877df9cc836?w=800",
-        "product": "https://images.unsplash.com/photo-1523275335684-37898b6baf30?w=800",
-        "sale": "https://images.unsplash.com/photo-1607083206869-4c7672e72a8a?w=800",
-        "luxury": "https://images.unsplash.com/photo-1549399542-7e3f8b79c341?w=800",
-        "technology": "https://images.unsplash.com/photo-1518770660439-4636190af475?w=800",
-        "health": "https://images.unsplash.com/photo-1505576399279-565b52d4ac71?w=800",
-        "organic": "https://images.unsplash.com/photo-1542838132-92c53300491e?w=800",
-        "korean": "https://images.unsplash.com/photo-1617093727343-374698b1b08d?w=800",
-        "default": "https://images.unsplash.com/photo-1557804506-669a67965ba0?w=800",
-    }
+    DEMO_IMAGES = DEMO_IMAGES
     
     def __init__(self):
         self.client = httpx.AsyncClient(timeout=60.0)
@@ -30,18 +51,14 @@ class ImageService:
     def get_instance(cls) -> "ImageService":
         """Get singleton instance."""
         if cls._instance is None:
-            cls._instance = cls()
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
         return cls._instance
     
     def get_demo_image(self, prompt: str) -> str:
         """Get a relevant demo image based on prompt keywords."""
-        prompt_lower = prompt.lower()
-        
-        for keyword, url in self.DEMO_IMAGES.items():
-            if keyword in prompt_lower:
-                return url
-        
-        return self.DEMO_IMAGES["default"]
+        return _lookup_demo_image(prompt.lower())
     
     async def generate_image_prompt(self, content_brief: Dict[str, Any]) -> str:
         """Generate an image prompt based on marketing content brief."""
@@ -123,6 +140,8 @@ PROMOTION_TEMPLATES = [
     }
 ]
 
+_PROMO_BY_ID = {p["id"]: p for p in PROMOTION_TEMPLATES}
+
 
 def get_promotion_templates():
     """Get all promotion templates."""
@@ -131,8 +150,5 @@ def get_promotion_templates():
 
 def get_promotion_by_id(promo_id: str):
     """Get a specific promotion template."""
-    for promo in PROMOTION_TEMPLATES:
-        if promo["id"] == promo_id:
-            return promo
-    return None
+    return _PROMO_BY_ID.get(promo_id)
 
@@ -1,66 +1,79 @@
 """LLM Service using OpenRouter with streaming support."""
 from typing import List, Dict, Any, Optional, AsyncGenerator
+from functools import cached_property
 from langchain_openai import ChatOpenAI
 from langchain.schema import HumanMessage, SystemMessage, AIMessage
 from langchain.callbacks import AsyncIteratorCallbackHandler
 import asyncio
-from app.config import OPENROUTER_API_KEY, OPENROUTER_BASE_URL, DEFAULT_MODEL, FALLBACK_MODEL
+import logging
+import threading
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# LangChain message class for each chat role; other roles are dropped
+_MSG_CLS = {"user": HumanMessage, "assistant": AIMessage, "system": SystemMessage}
 
 
 class LLMService:
     """Service for interacting with LLMs through OpenRouter."""
     
+    _lock = threading.Lock()
     _instances: Dict[str, "LLMService"] = {}
     
-    def __init__(self, model: str = DEFAULT_MODEL, temperature: float = 0.7):
+    def __init__(self, model: Optional[str] = None, temperature: float = 0.7):
+        settings = get_settings()
+        model = model or settings.default_model
         self.model = model
+        self.fallback_model = settings.fallback_model
         self.temperature = temperature
-        self.llm = ChatOpenAI(
-            model=model,
-            openai_api_key=OPENROUTER_API_KEY,
-            openai_api_base=OPENROUTER_BASE_URL,
-            temperature=temperature,
-            streaming=True,
-            default_headers={
-                "HTTP-Referer": "https://aihub.demo",
-                "X-Title": "AI Hub Demo"
-            }
-        )
+        self.api_key = settings.openrouter_api_key
+        self.base_url = settings.openrouter_base_url
+        self.llm = self._make_llm(model, streaming=True)
         # Non-streaming version for fallback
-        self.llm_sync = ChatOpenAI(
+        self.llm_sync = self._make_llm(model, streaming=False)
+    
+    def _make_llm(self, model: str, streaming: bool) -> ChatOpenAI:
+        """Create a LangChain client for a model on OpenRouter."""
+        return ChatOpenAI(
             model=model,
-            openai_api_key=OPENROUTER_API_KEY,
-            openai_api_base=OPENROUTER_BASE_URL,
-            temperature=temperature,
-            streaming=False,
+            openai_api_key=self.api_key,
+            openai_api_base=self.base_url,
+            temperature=self.temperature,
+            streaming=streaming,
             default_headers={
                 "HTTP-Referer": "https://aihub.demo",
                 "X-Title": "AI Hub Demo"
             }
         )
     
+    @cached_property
+    def fallback_llm(self) -> ChatOpenAI:
+        """Non-streaming client for the fallback model, built on the first failure."""
+        return self._make_llm(self.fallback_model, streaming=False)
+    
     @classmethod
-    def get_instance(cls, model: str = DEFAULT_MODEL, temperature: float = 0.7) -> "LLMService":
+    def get_instance(cls, model: Optional[str] = None, temperature: float = 0.7) -> "LLMService":
         """Get or create a singleton instance for a specific model."""
+        model = model or get_settings().default_model
         key = f"{model}_{temperature}"
-        if key not in cls._instances:
-            cls._instances[key] = cls(model, temperature)
-        return cls._instances[key]
+        instance = cls._instances.get(key)
+        if instance is None:
+            # Double-checked so concurrent first calls build only one client per key
+            with cls._lock:
+                instance = cls._instances.get(key)
+                if instance is None:
+                    instance = cls._instances[key] = cls(model, temperature)
+        return instance
     
     def _build_messages(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None):
         """Build LangChain message objects from dict format."""
-        langchain_messages = []
-        
-        if system_prompt:
-            langchain_messages.append(SystemMessage(content=system_prompt))
+        langchain_messages = [SystemMessage(content=system_prompt)] if system_prompt else []
         
         for msg in messages:
-            if msg["role"] == "user":
-                langchain_messages.append(HumanMessage(content=msg["content"]))
-            elif msg["role"] == "assistant":
-                langchain_messages.append(AIMessage(content=msg["content"]))
-            elif msg["role"] == "system":
-                langchain_messages.append(SystemMessage(content=msg["content"]))
+            msg_cls = _MSG_CLS.get(msg["role"])
+            if msg_cls is not None:
+                langchain_messages.append(msg_cls(content=msg["content"]))
         
         return langchain_messages
     
@@ -73,20 +86,9 @@ class LLMService:
             return response.content
         except Exception as e:
             # Try fallback model if primary fails
-            if self.model != FALLBACK_MODEL:
-                print(f"Primary model failed ({e}), trying fallback...")
-                fallback_llm = ChatOpenAI(
-                    model=FALLBACK_MODEL,
-                    openai_api_key=OPENROUTER_API_KEY,
-                    openai_api_base=OPENROUTER_BASE_URL,
-                    temperature=self.temperature,
-                    streaming=False,
-                    default_headers={
-                        "HTTP-Referer": "https://aihub.demo",
-                        "X-Title": "AI Hub Demo"
-                    }
-                )
-                response = await fallback_llm.ainvoke(langchain_messages)
+            if self.model != self.fallback_model:
+                logger.warning("Primary model failed (%s), trying fallback", e)
+                response = await self.fallback_llm.ainvoke(langchain_messages)
                 return response.content
             raise
     
@@ -100,7 +102,7 @@ class LLMService:
                     yield chunk.content
         except Exception as e:
             # Fallback to non-streaming if streaming fails
-            print(f"Streaming failed ({e}), falling back to non-streaming...")
+            logger.warning("Streaming failed (%s), falling back to non-streaming", e)
             response = await self.chat(messages, system_prompt)
             yield response
     
@@ -1,19 +1,57 @@
 """OpenAI Service - Direct OpenAI SDK integration with OpenRouter."""
 from typing import List, Dict, Any, Optional, AsyncGenerator
+import asyncio
+import logging
+import threading
 import httpx
-from app.config import OPENROUTER_API_KEY, OPENROUTER_BASE_URL, DEFAULT_MODEL, FALLBACK_MODEL
+import orjson
+from app.config import get_settings
+from app.services.single_flight import request_key, share_call
+
+logger = logging.getLogger(__name__)
+
+
+async def _iter_sse_data(response: httpx.Response) -> AsyncGenerator[bytes, None]:
+    """Yield the payload of each ``data:`` line of an SSE response as raw bytes.
+    
+    Splits the byte stream directly so lines are never decoded to str;
+    orjson parses the payload bytes as-is.
+    """
+    buffer = bytearray()
+    async for chunk in response.aiter_bytes():
+        buffer += chunk
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end == -1:
+                break
+            if buffer.startswith(b"data: ", start, end):
+                yield bytes(buffer[start + 6:end]).rstrip(b"\r")
+            start = end + 1
+        del buffer[:start]
+    if buffer.startswith(b"data: "):
+        yield bytes(buffer[6:]).rstrip(b"\r")
 
 
 class OpenAIService:
     """Service for interacting with LLMs through OpenRouter using httpx."""
     
+    _lock = threading.Lock()
     _instances: Dict[str, "OpenAIService"] = {}
+    # One connection pool shared by every instance, so concurrent requests reuse
+    # keep-alive connections to OpenRouter instead of opening a client per call
+    _client: Optional[httpx.AsyncClient] = None
+    # Upstream chat calls in progress, keyed on request content, so identical
+    # concurrent requests share one call instead of each paying for their own
+    _inflight: Dict[bytes, "asyncio.Task[str]"] = {}
     
-    def __init__(self, model: str = DEFAULT_MODEL, temperature: float = 0.7):
-        self.model = model
+    def __init__(self, model: Optional[str] = None, temperature: float = 0.7):
+        settings = get_settings()
+        self.model = model or settings.default_model
+        self.fallback_model = settings.fallback_model
         self.temperature = temperature
-        self.api_key = OPENROUTER_API_KEY
-        self.base_url = OPENROUTER_BASE_URL
+        self.api_key = settings.openrouter_api_key
+        self.base_url = settings.openrouter_base_url
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
@@ -22,95 +60,124 @@ class OpenAIService:
         }
     
     @classmethod
-    def get_instance(cls, model: str = DEFAULT_MODEL, temperature: float = 0.7) -> "OpenAIService":
+    def get_instance(cls, model: Optional[str] = None, temperature: float = 0.7) -> "OpenAIService":
         """Get or create a singleton instance for a specific model."""
+        model = model or get_settings().default_model
         key = f"{model}_{temperature}"
-        if key not in cls._instances:
-            cls._instances[key] = cls(model, temperature)
-        return cls._instances[key]
+        instance = cls._instances.get(key)
+        if instance is None:
+            # Double-checked so concurrent first calls build only one client per key
+            with cls._lock:
+                instance = cls._instances.get(key)
+                if instance is None:
+                    instance = cls._instances[key] = cls(model, temperature)
+        return instance
+    
+    @classmethod
+    def get_client(cls) -> httpx.AsyncClient:
+        """Get the shared HTTP client, creating it on first use."""
+        if cls._client is None or cls._client.is_closed:
+            # HTTP/2 multiplexes concurrent completions over one connection; with
+            # brotli installed httpx also negotiates and decodes br-compressed bodies
+            cls._client = httpx.AsyncClient(
+                timeout=60.0,
+                http2=True,
+                limits=httpx.Limits(max_connections=200, max_keepalive_connections=50, keepalive_expiry=30.0)
+            )
+        return cls._client
+    
+    @classmethod
+    async def aclose(cls):
+        """Close the shared HTTP client, e.g. on application shutdown."""
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
     
     def _build_messages(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None) -> List[Dict[str, str]]:
-        """Build message list with optional system prompt."""
-        result = []
-        
-        if system_prompt:
-            result.append({"role": "system", "content": system_prompt})
+        """Build message list with optional system prompt.
         
-        result.extend(messages)
-        return result
+        Without a system prompt the caller's list is returned as-is, so neither
+        side may mutate it afterwards.
+        """
+        if not system_prompt:
+            return messages
+        return [{"role": "system", "content": system_prompt}, *messages]
     
     async def chat(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None) -> str:
-        """Send a chat message and get a response (non-streaming)."""
-        full_messages = self._build_messages(messages, system_prompt)
+        """Send a chat message and get a response (non-streaming).
         
+        Identical requests already in flight are joined rather than sent again.
+        """
+        key = request_key(self.model, self.temperature, messages, system_prompt)
+        return await share_call(self._inflight, key, lambda: self._chat(messages, system_prompt))
+    
+    async def _chat(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None) -> str:
+        """Make one non-streaming upstream call, falling back to the fallback model."""
         payload = {
             "model": self.model,
-            "messages": full_messages,
+            "messages": self._build_messages(messages, system_prompt),
             "temperature": self.temperature,
         }
         
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            try:
+        client = self.get_client()
+        try:
+            response = await client.post(
+                f"{self.base_url}/chat/completions",
+                headers=self.headers,
+                content=orjson.dumps(payload)
+            )
+            response.raise_for_status()
+            data = response.json()
+            return data["choices"][0]["message"]["content"]
+        except Exception as e:
+            # Try fallback model if primary fails
+            if self.model != self.fallback_model:
+                logger.warning("Primary model failed (%s), trying fallback", e)
+                payload["model"] = self.fallback_model
                 response = await client.post(
                     f"{self.base_url}/chat/completions",
                     headers=self.headers,
-                    json=payload
+                    content=orjson.dumps(payload)
                 )
                 response.raise_for_status()
                 data = response.json()
                 return data["choices"][0]["message"]["content"]
-            except Exception as e:
-                # Try fallback model if primary fails
-                if self.model != FALLBACK_MODEL:
-                    print(f"Primary model failed ({e}), trying fallback...")
-                    payload["model"] = FALLBACK_MODEL
-                    response = await client.post(
-                        f"{self.base_url}/chat/completions",
-                        headers=self.headers,
-                        json=payload
-                    )
-                    response.raise_for_status()
-                    data = response.json()
-                    return data["choices"][0]["message"]["content"]
-                raise
+            raise
     
     async def chat_stream(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None) -> AsyncGenerator[str, None]:
         """Send a chat message and stream the response."""
-        full_messages = self._build_messages(messages, system_prompt)
-        
         payload = {
             "model": self.model,
-            "messages": full_messages,
+            "messages": self._build_messages(messages, system_prompt),
             "temperature": self.temperature,
             "stream": True,
         }
         
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            try:
-                async with client.stream(
-                    "POST",
-                    f"{self.base_url}/chat/completions",
-                    headers=self.headers,
-                    json=payload
-                ) as response:
-                    response.raise_for_status()
-                    async for line in response.aiter_lines():
-                        if line.startswith("data: "):
-                            data = line[6:]
-                            if data == "[DONE]":
-                                break
-                            try:
-                                import json
-                                chunk = json.loads(data)
-                                if chunk["choices"][0]["delta"].get("content"):
-                                    yield chunk["choices"][0]["delta"]["content"]
-                            except:
-                                continue
-            except Exception as e:
-                # Fallback to non-streaming if streaming fails
-                print(f"Streaming failed ({e}), falling back to non-streaming...")
-                response = await self.chat(messages, system_prompt)
-                yield response
+        client = self.get_client()
+        try:
+            async with client.stream(
+                "POST",
+                f"{self.base_url}/chat/completions",
+                headers=self.headers,
+                content=orjson.dumps(payload),
+                timeout=120.0
+            ) as response:
+                response.raise_for_status()
+                async for data in _iter_sse_data(response):
+                    if data == b"[DONE]":
+                        break
+                    try:
+                        content = orjson.loads(data)["choices"][0]["delta"].get("content")
+                    except (orjson.JSONDecodeError, KeyError, IndexError, TypeError):
+                        # Malformed or non-content chunks (e.g. usage-only) are skipped
+                        continue
+                    if content:
+                        yield content
+        except Exception as e:
+            # Fallback to non-streaming if streaming fails
+            logger.warning("Streaming failed (%s), falling back to non-streaming", e)
+            response = await self.chat(messages, system_prompt)
+            yield response
     
     async def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         """Generate a response from a single prompt."""
@@ -0,0 +1,47 @@
+"""In-process cache for agent responses keyed on the request content."""
+from typing import Any, Awaitable, Callable, Optional
+from cachetools import TTLCache
+from app.config import get_settings
+from app.services.single_flight import request_key
+
+
+class ResponseCache:
+    """Exact-match TTL cache for responses to identical requests."""
+
+    _instance: Optional["ResponseCache"] = None
+
+    def __init__(self, maxsize: Optional[int] = None, ttl: Optional[int] = None):
+        settings = get_settings()
+        maxsize = settings.response_cache_size if maxsize is None else maxsize
+        ttl = settings.response_cache_ttl if ttl is None else ttl
+        self.enabled = ttl > 0
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=max(ttl, 1))
+
+    @classmethod
+    def get_instance(cls) -> "ResponseCache":
+        """Get singleton instance."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    # Hash JSON-serializable request parts into a compact cache key
+    make_key = staticmethod(request_key)
+
+    def get(self, key: bytes) -> Optional[Any]:
+        """Return the cached value for a key, or None on a miss."""
+        if not self.enabled:
+            return None
+        return self._cache.get(key)
+
+    def set(self, key: bytes, value: Any):
+        """Store a value under a key."""
+        if self.enabled:
+            self._cache[key] = value
+
+    async def get_or_call(self, key: bytes, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for a key, awaiting the factory and caching its result on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = await factory()
+            self.set(key, value)
+        return value
@@ -0,0 +1,38 @@
+"""Share one upstream call among identical requests that are in flight together."""
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+import asyncio
+import hashlib
+import orjson
+
+T = TypeVar("T")
+
+
+def request_key(*parts: Any) -> bytes:
+    """Hash JSON-serializable request parts into a compact key."""
+    payload = orjson.dumps(parts, option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+def share_call(
+    inflight: Dict[bytes, "asyncio.Task[T]"],
+    key: bytes,
+    start: Callable[[], Awaitable[T]]
+) -> Awaitable[T]:
+    """Join the call in flight for key, or start it; await the result.
+
+    The call is shielded, so one caller cancelling doesn't cancel it for the
+    others. If every caller goes away the call still finishes, and its error
+    is consumed here instead of being logged as never retrieved.
+    """
+    task = inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(start())
+        inflight[key] = task
+
+        def finished(done: "asyncio.Task[T]"):
+            inflight.pop(key, None)
+            if not done.cancelled():
+                done.exception()
+
+        task.add_done_callback(finished)
+    return asyncio.shield(task)
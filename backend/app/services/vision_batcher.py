@@ -0,0 +1,99 @@
+"""Async batch queue that coalesces concurrent vision requests."""
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+
+BatchItem = Tuple[str, str]
+BatchFn = Callable[[List[BatchItem]], Awaitable[List[Any]]]
+
+# How often the batching window checks for newly queued requests
+_POLL_INTERVAL = 0.005  # seconds
+
+
+class AsyncBatchQueue:
+    """Collect (image_base64, prompt) requests and dispatch them in batches.
+
+    Requests arriving within ``max_wait_time`` of the first queued one are
+    grouped (up to ``max_batch_size``) and handed to ``process_fn`` together.
+    Each caller awaits its own future and receives its own result.
+    """
+
+    def __init__(
+        self,
+        process_fn: BatchFn,
+        single_fn: Optional[Callable[[str, str], Awaitable[Any]]] = None,
+        max_batch_size: int = 8,
+        max_wait_time: float = 0.05
+    ):
+        self.process_fn = process_fn
+        self.single_fn = single_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_time = max_wait_time
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+
+    def _ensure_started(self):
+        """Start the processing loop on first use, inside the running event loop."""
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self.process_loop())
+
+    async def add_request(self, image_base64: str, prompt: str) -> Any:
+        """Queue a request and wait for its result."""
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(((image_base64, prompt), future))
+        return await future
+
+    async def process_loop(self):
+        """Drain the queue, grouping requests that arrive within the wait window."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait_time
+
+            # Polled with get_nowait: before Python 3.12, wait_for(get()) can time
+            # out after the get has dequeued an item, dropping that request
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                await asyncio.sleep(min(remaining, _POLL_INTERVAL))
+
+            # Dispatch without blocking so the next batch can start filling
+            task = loop.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: List[Tuple[BatchItem, asyncio.Future]]):
+        """Run one batch and resolve each caller's future.
+
+        Every future is settled: with its result, with the batch's error, or
+        cancelled if the dispatch itself is cancelled.
+        """
+        items = [item for item, _ in batch]
+        futures = [future for _, future in batch]
+
+        try:
+            # A lone request goes through the single-call path when one is provided
+            if len(items) == 1 and self.single_fn is not None:
+                results = [await self.single_fn(*items[0])]
+            else:
+                results = await self.process_fn(items)
+            if len(results) != len(futures):
+                raise RuntimeError(f"Batch returned {len(results)} results for {len(futures)} requests")
+            for future, result in zip(futures, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            for future in futures:
+                if not future.done():
+                    future.cancel()
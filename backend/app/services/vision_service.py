@@ -1,51 +1,91 @@
 """Vision Service for image analysis using OpenRouter."""
-import base64
-from typing import Optional
+import asyncio
+import hashlib
+import logging
+import threading
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional, Tuple
+import httpx
+import openai
 from langchain_openai import ChatOpenAI
 from langchain.schema import HumanMessage
-from app.config import OPENROUTER_API_KEY, OPENROUTER_BASE_URL, VISION_MODEL, FALLBACK_MODEL
+from app.config import get_settings
+from app.services.response_cache import ResponseCache
+from app.services.single_flight import share_call
+
+logger = logging.getLogger(__name__)
 
 
 class VisionService:
     """Service for vision/multimodal AI tasks."""
     
     _instance: Optional["VisionService"] = None
+    _lock = threading.Lock()
     
     def __init__(self):
-        self.llm = ChatOpenAI(
-            model=VISION_MODEL,
-            openai_api_key=OPENROUTER_API_KEY,
-            openai_api_base=OPENROUTER_BASE_URL,
-            temperature=0.3,
-            max_tokens=4096,
-            default_headers={
-                "HTTP-Referer": "https://aihub.demo",
-                "X-Title": "AI Hub Demo"
-            }
+        settings = get_settings()
+        self.hedge_delay = settings.vision_hedge_delay
+        self.call_timeout = settings.vision_call_timeout
+        # Successful analyses by content hash, plus calls in progress so
+        # concurrent duplicates wait for one answer instead of each paying for it
+        self._results = ResponseCache(maxsize=settings.vision_cache_size, ttl=settings.vision_cache_ttl)
+        self._inflight: Dict[bytes, "asyncio.Task[str]"] = {}
+        # One keep-alive pool for both models, so the fallback reuses warm
+        # connections to OpenRouter instead of handshaking on its own
+        self.http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(120.0, connect=5.0, write=30.0, pool=5.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
         )
+        self.llm = self._make_llm(settings, settings.vision_model)
         # Fallback vision model
-        self.fallback_llm = ChatOpenAI(
-            model=FALLBACK_MODEL,
-            openai_api_key=OPENROUTER_API_KEY,
-            openai_api_base=OPENROUTER_BASE_URL,
+        self.fallback_llm = self._make_llm(settings, settings.fallback_model)
+    
+    def _make_llm(self, settings, model: str) -> ChatOpenAI:
+        """Create a vision client for a model that sends its requests through the shared pool."""
+        headers = {
+            "HTTP-Referer": "https://aihub.demo",
+            "X-Title": "AI Hub Demo"
+        }
+        # ChatOpenAI passes its http_client option to its sync client as well,
+        # so the async completions client is built here around the shared pool
+        async_client = openai.AsyncOpenAI(
+            api_key=settings.openrouter_api_key,
+            base_url=settings.openrouter_base_url,
+            max_retries=settings.vision_max_retries,
+            default_headers=headers,
+            http_client=self.http_client
+        ).chat.completions
+        return ChatOpenAI(
+            model=model,
+            openai_api_key=settings.openrouter_api_key,
+            openai_api_base=settings.openrouter_base_url,
             temperature=0.3,
             max_tokens=4096,
-            default_headers={
-                "HTTP-Referer": "https://aihub.demo",
-                "X-Title": "AI Hub Demo"
-            }
+            max_retries=settings.vision_max_retries,
+            default_headers=headers,
+            async_client=async_client
         )
     
+    @classmethod
+    async def aclose(cls):
+        """Close the singleton's connection pool, e.g. on application shutdown."""
+        if cls._instance is not None:
+            await cls._instance.http_client.aclose()
+            cls._instance = None
+    
     @classmethod
     def get_instance(cls) -> "VisionService":
         """Get singleton instance."""
         if cls._instance is None:
-            cls._instance = cls()
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
         return cls._instance
     
-    async def analyze_image(self, image_base64: str, prompt: str, mime_type: str = "image/jpeg") -> str:
-        """Analyze an image with a text prompt."""
-        message = HumanMessage(
+    @staticmethod
+    def _image_message(image_base64: str, prompt: str, mime_type: str = "image/jpeg") -> HumanMessage:
+        """Build a multimodal message from a base64 image and a text prompt."""
+        return HumanMessage(
             content=[
                 {
                     "type": "image_url",
@@ -59,14 +99,179 @@ class VisionService:
                 }
             ]
         )
+    
+    async def _invoke_with_fallback(self, messages: List[HumanMessage]) -> str:
+        """Invoke the primary vision model, hedging with the fallback model.
         
+        Transient errors are already retried with backoff inside the client
+        (see Settings.vision_max_retries). The fallback starts as soon as the
+        primary fails, or races it once the primary has stalled for
+        vision_hedge_delay seconds; the first successful answer wins. Both
+        are abandoned with asyncio.TimeoutError once vision_call_timeout
+        seconds have passed without an answer.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.call_timeout
+        primary = asyncio.ensure_future(self.llm.ainvoke(messages))
+        tasks = {primary}
         try:
-            response = await self.llm.ainvoke([message])
-            return response.content
+            await asyncio.wait(tasks, timeout=min(self.hedge_delay, self.call_timeout))
+            if primary.done() and primary.exception() is None:
+                return primary.result().content
+            if primary.done():
+                logger.warning("Vision model failed (%s), trying fallback", primary.exception())
+                tasks.clear()
+            else:
+                logger.warning("Vision model slow (>%ss), racing fallback", self.hedge_delay)
+            fallback = asyncio.ensure_future(self.fallback_llm.ainvoke(messages))
+            tasks.add(fallback)
+            while True:
+                done, _ = await asyncio.wait(
+                    tasks, timeout=max(deadline - loop.time(), 0), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise asyncio.TimeoutError(f"Vision call exceeded {self.call_timeout}s")
+                for task in (primary, fallback):
+                    if task in done and task.exception() is None:
+                        return task.result().content
+                tasks -= done
+                if not tasks:
+                    # Both failed; surface the fallback's error as before
+                    return fallback.result().content
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    @staticmethod
+    def _cache_key(image_base64: str, prompt: str, mime_type: str) -> bytes:
+        """Hash an analysis request; blake2b is fast and collision-resistant enough for a cache."""
+        digest = hashlib.blake2b(image_base64.encode(), digest_size=16)
+        for part in (mime_type, prompt):
+            digest.update(b"\0")
+            digest.update(part.encode())
+        return digest.digest()
+    
+    async def analyze_image(self, image_base64: str, prompt: str, mime_type: str = "image/jpeg") -> str:
+        """Analyze a base64-encoded image with a text prompt.
+        
+        Repeated requests for the same image and prompt are answered from cache.
+        """
+        key = self._cache_key(image_base64, prompt, mime_type)
+        result = self._results.get(key)
+        if result is None:
+            result = await share_call(
+                self._inflight,
+                key,
+                lambda: self._invoke_with_fallback([self._image_message(image_base64, prompt, mime_type)])
+            )
+            self._results.set(key, result)
+        return result
+    
+    async def _astream_until(self, llm: ChatOpenAI, messages: List[HumanMessage], deadline: float) -> AsyncIterator[str]:
+        """Stream a model's text chunks, raising asyncio.TimeoutError once the loop clock passes deadline."""
+        loop = asyncio.get_running_loop()
+        stream = llm.astream(messages).__aiter__()
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError(f"Vision stream exceeded {self.call_timeout}s")
+                try:
+                    chunk = await asyncio.wait_for(stream.__anext__(), remaining)
+                except StopAsyncIteration:
+                    return
+                if chunk.content:
+                    yield chunk.content
+        finally:
+            await stream.aclose()
+    
+    async def astream_image(self, image_base64: str, prompt: str, mime_type: str = "image/jpeg") -> AsyncIterator[str]:
+        """Stream the analysis of a base64-encoded image as it is generated.
+        
+        A cached answer, or one already being produced by analyze_image, is
+        sent as a single chunk. If the primary model fails before producing
+        any text, the fallback model is streamed instead; once text has been
+        sent, errors propagate to the caller. The whole stream, fallback
+        included, is bounded by vision_call_timeout.
+        """
+        key = self._cache_key(image_base64, prompt, mime_type)
+        cached = self._results.get(key)
+        task = self._inflight.get(key) if cached is None else None
+        if task is not None:
+            cached = await asyncio.wait_for(asyncio.shield(task), self.call_timeout)
+        if cached is not None:
+            yield cached
+            return
+        
+        deadline = asyncio.get_running_loop().time() + self.call_timeout
+        messages = [self._image_message(image_base64, prompt, mime_type)]
+        chunks = []
+        try:
+            async for text in self._astream_until(self.llm, messages, deadline):
+                chunks.append(text)
+                yield text
         except Exception as e:
-            print(f"Vision model failed ({e}), trying fallback...")
-            response = await self.fallback_llm.ainvoke([message])
+            if chunks:
+                raise
+            logger.warning("Vision model failed (%s), trying fallback", e)
+            async for text in self._astream_until(self.fallback_llm, messages, deadline):
+                chunks.append(text)
+                yield text
+        self._results.set(key, "".join(chunks))
+    
+    async def analyze_images_batch(self, requests: List[Tuple[str, str]]) -> List[str]:
+        """Analyze several (image_base64, prompt) pairs in one batched call.
+        
+        Results are returned in request order. Like analyze_image, answers
+        come from the cache or from an identical call already in flight when
+        possible; only the remaining distinct requests are sent as a batch,
+        and their results are cached.
+        """
+        keys = [self._cache_key(image_base64, prompt, "image/jpeg") for image_base64, prompt in requests]
+        answers: Dict[bytes, str] = {}
+        pending: Dict[bytes, Awaitable[str]] = {}
+        misses: Dict[bytes, Tuple[str, str]] = {}
+        for key, request in zip(keys, requests):
+            if key in answers or key in pending or key in misses:
+                continue
+            cached = self._results.get(key)
+            if cached is not None:
+                answers[key] = cached
+            elif key in self._inflight:
+                pending[key] = asyncio.shield(self._inflight[key])
+            else:
+                misses[key] = request
+        
+        if misses:
+            inputs = [[self._image_message(image_base64, prompt)] for image_base64, prompt in misses.values()]
+            batch = asyncio.ensure_future(self._batch_call(inputs))
+            for pos, key in enumerate(misses):
+                # Registered as in flight, so analyze_image calls for these keys join the batch
+                pending[key] = share_call(
+                    self._inflight, key, lambda pos=pos: self._batch_item(batch, inputs[pos], pos)
+                )
+        
+        for key, result in zip(pending, await asyncio.gather(*pending.values())):
+            self._results.set(key, result)
+            answers[key] = result
+        return [answers[key] for key in keys]
+    
+    async def _batch_call(self, inputs: List[List[HumanMessage]]) -> List[Any]:
+        """Run one primary-model batch, bounded by vision_call_timeout; failed items come back as exceptions."""
+        try:
+            return await asyncio.wait_for(
+                self.llm.abatch(inputs, return_exceptions=True), self.call_timeout
+            )
+        except asyncio.TimeoutError as e:
+            return [e] * len(inputs)
+    
+    async def _batch_item(self, batch: "asyncio.Future[List[Any]]", messages: List[HumanMessage], pos: int) -> str:
+        """Take one item's answer from a batch, retrying it through _invoke_with_fallback if it failed."""
+        response = (await asyncio.shield(batch))[pos]
+        if not isinstance(response, Exception):
             return response.content
+        logger.warning("Vision batch item failed (%r), retrying with fallback", response)
+        return await self._invoke_with_fallback(messages)
     
     async def analyze_image_from_url(self, image_url: str, prompt: str) -> str:
         """Analyze an image from a URL."""
@@ -83,10 +288,4 @@ class VisionService:
             ]
         )
         
-        try:
-            response = await self.llm.ainvoke([message])
-            return response.content
-        except Exception as e:
-            print(f"Vision model failed ({e}), trying fallback...")
-            response = await self.fallback_llm.ainvoke([message])
-            return response.content
+        return await self._invoke_with_fallback([message])
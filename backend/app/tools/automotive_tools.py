@@ -2,7 +2,19 @@
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 from app.data.mock_data import MockDataStore
-import random
+from app.tools.ids import next_id
+import re
+
+# (duration, cost) estimates by service keyword, in matching priority order
+_SERVICE_ESTIMATES = {
+    "oil change": ("1 hour", "$49.99"),
+    "brake": ("2-3 hours", "$199-$399"),
+    "tire": ("1 hour", "$89.99"),
+    "general": ("1-2 hours", "TBD after inspection"),
+}
+# One pass finds every keyword; the lookahead also reports overlapping matches
+_SERVICE_RE = re.compile("(?=(%s))" % "|".join(map(re.escape, _SERVICE_ESTIMATES)), re.IGNORECASE)
+_SERVICE_PRIORITY = {key: i for i, key in enumerate(_SERVICE_ESTIMATES)}
 
 
 class AutomotiveTools:
@@ -15,10 +27,10 @@ class AutomotiveTools:
         body_type: Optional[str] = None
     ) -> Dict[str, Any]:
         """Search for vehicles matching criteria."""
-        vehicles = MockDataStore.get_available_vehicles(brand)
-        
         if max_price:
-            vehicles = [v for v in vehicles if v["price"] <= max_price]
+            vehicles = [v for v in MockDataStore.iter_available_vehicles(brand) if v["price"] <= max_price]
+        else:
+            vehicles = MockDataStore.get_available_vehicles(brand)
         
         return {
             "tool": "search_vehicles",
@@ -98,7 +110,7 @@ class AutomotiveTools:
             }
         
         # Generate confirmation
-        confirmation_id = f"TD-{random.randint(10000, 99999)}"
+        confirmation_id = next_id("TD")
         scheduled_time = preferred_time or "2:00 PM"
         scheduled_date = preferred_date or (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
         
@@ -126,7 +138,8 @@ class AutomotiveTools:
         monthly_rate = interest_rate / 100 / 12
         
         if monthly_rate > 0:
-            monthly_payment = loan_amount * (monthly_rate * (1 + monthly_rate)**term_months) / ((1 + monthly_rate)**term_months - 1)
+            growth = (1 + monthly_rate) ** term_months
+            monthly_payment = loan_amount * monthly_rate * growth / (growth - 1)
         else:
             monthly_payment = loan_amount / term_months
         
@@ -153,22 +166,16 @@ class AutomotiveTools:
         preferred_date: str = None
     ) -> Dict[str, Any]:
         """Book a service appointment."""
-        confirmation_id = f"SVC-{random.randint(10000, 99999)}"
+        confirmation_id = next_id("SVC")
         scheduled_date = preferred_date or (datetime.now() + timedelta(days=2)).strftime("%Y-%m-%d")
         
-        # Estimate based on service type
-        estimates = {
-            "oil change": {"duration": "1 hour", "cost": "$49.99"},
-            "brake": {"duration": "2-3 hours", "cost": "$199-$399"},
-            "tire": {"duration": "1 hour", "cost": "$89.99"},
-            "general": {"duration": "1-2 hours", "cost": "TBD after inspection"}
-        }
-        
-        service_key = "general"
-        for key in estimates:
-            if key in service_type.lower():
-                service_key = key
-                break
+        # Estimate based on service type; earlier keywords win when several appear
+        service_key = min(
+            (m.group(1).lower() for m in _SERVICE_RE.finditer(service_type)),
+            key=_SERVICE_PRIORITY.__getitem__,
+            default="general",
+        )
+        duration, cost = _SERVICE_ESTIMATES[service_key]
         
         return {
             "tool": "book_service_appointment",
@@ -178,8 +185,8 @@ class AutomotiveTools:
             "service_type": service_type,
             "scheduled_date": scheduled_date,
             "scheduled_time": "9:00 AM",
-            "estimated_duration": estimates[service_key]["duration"],
-            "estimated_cost": estimates[service_key]["cost"],
+            "estimated_duration": duration,
+            "estimated_cost": cost,
             "location": "Service Center, 456 Auto Drive"
         }
 
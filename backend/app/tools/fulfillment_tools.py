@@ -2,8 +2,16 @@
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 from app.data.mock_data import MockDataStore
+from app.tools.ids import next_id, random_ref
+import heapq
+import itertools
 import random
 
+# Demo bin numbers within a zone
+_BIN_COUNT = 50
+# Own generator for demo delivery dates, independent of the global random state
+_rng = random.Random()
+
 
 class FulfillmentTools:
     """Tools for order fulfillment operations."""
@@ -11,12 +19,12 @@ class FulfillmentTools:
     @staticmethod
     def receive_order(order_items: List[Dict[str, Any]], customer_id: str = None) -> Dict[str, Any]:
         """Receive and validate an incoming order."""
-        order_id = f"ORD-{random.randint(10000, 99999)}"
+        order_id = next_id("ORD")
         
         validated_items = []
         for item in order_items:
             validated_items.append({
-                "sku": item.get("sku", f"SKU-{random.randint(100, 999)}"),
+                "sku": item["sku"] if "sku" in item else next_id("SKU"),
                 "name": item.get("name", "Unknown Item"),
                 "quantity": item.get("quantity", 1),
                 "validated": True
@@ -37,14 +45,14 @@ class FulfillmentTools:
         """Check inventory levels across all warehouses."""
         inventory = MockDataStore.check_inventory(sku)
         
-        total_quantity = sum(w["quantity"] for w in inventory.get("warehouses", []))
+        total_quantity = MockDataStore.total_stock(sku)
         
         return {
             "tool": "check_inventory",
             "status": "success",
             "sku": sku,
             "total_available": total_quantity,
-            "warehouses": inventory.get("warehouses", []),
+            "warehouses": inventory["warehouses"],
             "in_stock": total_quantity > 0
         }
     
@@ -58,13 +66,13 @@ class FulfillmentTools:
         allocations = []
         remaining = quantity_needed
         
-        # Sort by quantity (allocate from largest stock first)
-        sorted_warehouses = sorted(warehouses, key=lambda x: x.get("quantity", 0), reverse=True)
+        # Allocate from largest stock first; a heap pops only the warehouses
+        # actually needed instead of sorting them all (index keeps ties in order)
+        heap = [(-wh.get("quantity", 0), idx, wh) for idx, wh in enumerate(warehouses)]
+        heapq.heapify(heap)
         
-        for wh in sorted_warehouses:
-            if remaining <= 0:
-                break
-            
+        while remaining > 0 and heap:
+            _, _, wh = heapq.heappop(heap)
             available = wh.get("quantity", 0)
             alloc_qty = min(remaining, available)
             
@@ -91,7 +99,9 @@ class FulfillmentTools:
     @staticmethod
     def generate_pick_list(allocations: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Generate optimized pick list for warehouse workers."""
-        pick_list_id = f"PL-{random.randint(10000, 99999)}"
+        pick_list_id = next_id("PL")
+        # Bins are numbered per pick list, so output doesn't depend on earlier calls
+        bin_slots = itertools.cycle(range(1, _BIN_COUNT + 1))
         
         # Group by warehouse and sort by zone
         warehouse_picks = {}
@@ -106,7 +116,7 @@ class FulfillmentTools:
                 "sku": alloc.get("sku"),
                 "quantity": alloc.get("quantity"),
                 "zone": alloc.get("zone"),
-                "bin_location": f"{alloc.get('zone', 'A1')}-{random.randint(1, 50):02d}"
+                "bin_location": f"{alloc.get('zone', 'A1')}-{next(bin_slots):02d}"
             })
         
         # Sort items within each warehouse by zone
@@ -129,10 +139,10 @@ class FulfillmentTools:
         delivery_address: str = "Customer Address"
     ) -> Dict[str, Any]:
         """Schedule delivery for fulfilled order."""
-        tracking_number = f"TRK-{random.randint(100000, 999999)}"
+        tracking_number = random_ref("TRK")
         
         # Calculate delivery date (1-2 business days)
-        delivery_date = datetime.now() + timedelta(days=random.randint(1, 2))
+        delivery_date = datetime.now() + timedelta(days=_rng.randint(1, 2))
         
         return {
             "tool": "schedule_delivery",
@@ -0,0 +1,22 @@
+"""Identifier generation for tool results."""
+import itertools
+import secrets
+import time
+
+# Process-wide sequence seeded from the clock. IDs are unique within a process;
+# a restart only avoids earlier IDs if fewer were issued than seconds elapsed.
+_counter = itertools.count(int(time.time()))
+
+
+def next_id(prefix: str) -> str:
+    """Return a unique ID for a record created by a tool, e.g. ``ORD-6A1F3C2B``.
+    
+    IDs are sequential and therefore guessable; use random_ref for
+    references a customer could use to look up someone else's record.
+    """
+    return f"{prefix}-{next(_counter):X}"
+
+
+def random_ref(prefix: str) -> str:
+    """Return an unguessable customer-facing reference, e.g. ``TRK-9C41E2``."""
+    return f"{prefix}-{secrets.token_hex(3).upper()}"
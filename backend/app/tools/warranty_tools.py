@@ -1,8 +1,91 @@
 """Tools for Warranty Claims Agent."""
 from typing import Dict, Any, List, Optional
-from datetime import datetime
+from datetime import datetime, date
+from functools import lru_cache
 from app.data.mock_data import MockDataStore
-import random
+from app.tools.ids import next_id, random_ref
+
+
+# Warranty validity and fraud heuristics depend on the current date and on the
+# mock data, so both are part of the cache key: entries roll over at midnight
+# and whenever MockDataStore.version is bumped. Cached results are shared
+# between callers and must be treated as read-only.
+
+@lru_cache(maxsize=1024)
+def _verify_warranty(serial_number: str, today: date, data_version: int) -> Dict[str, Any]:
+    warranty_info = MockDataStore.check_warranty(serial_number)
+    
+    return {
+        "tool": "verify_warranty",
+        "status": "success",
+        "serial_number": serial_number,
+        "warranty_valid": warranty_info.get("valid", False),
+        "product": warranty_info.get("product", "Unknown"),
+        "purchase_date": warranty_info.get("purchase_date"),
+        "warranty_end": warranty_info.get("warranty_end"),
+        "previous_claims": warranty_info.get("previous_claims", 0),
+        "coverage_type": "Full replacement" if warranty_info.get("valid") else "None"
+    }
+
+
+@lru_cache(maxsize=1024)
+def _check_fraud_indicators(
+    serial_number: str,
+    claim_history: int,
+    purchase_date: Optional[str],
+    today: date
+) -> Dict[str, Any]:
+    fraud_flags = []
+    risk_score = 0
+    
+    # Check for multiple claims
+    if claim_history > 0:
+        fraud_flags.append({
+            "indicator": "Previous claims exist",
+            "severity": "medium",
+            "details": f"{claim_history} previous claim(s) on this serial number"
+        })
+        risk_score += 30
+    
+    if claim_history > 2:
+        fraud_flags.append({
+            "indicator": "Excessive claims",
+            "severity": "high",
+            "details": "More than 2 claims on same product"
+        })
+        risk_score += 40
+    
+    # Check if claim is very soon after purchase
+    if purchase_date:
+        try:
+            days_since_purchase = (today - date.fromisoformat(purchase_date)).days
+        except ValueError:
+            days_since_purchase = None
+        if days_since_purchase is not None and days_since_purchase < 7:
+            fraud_flags.append({
+                "indicator": "Claim too soon after purchase",
+                "severity": "medium",
+                "details": f"Claimed within {days_since_purchase} days of purchase"
+            })
+            risk_score += 20
+    
+    # Determine risk level
+    if risk_score >= 70:
+        risk_level = "high"
+    elif risk_score >= 30:
+        risk_level = "medium"
+    else:
+        risk_level = "low"
+    
+    return {
+        "tool": "check_fraud_indicators",
+        "status": "success",
+        "serial_number": serial_number,
+        "fraud_flags": fraud_flags,
+        "risk_score": risk_score,
+        "risk_level": risk_level,
+        "recommendation": "manual_review" if risk_level == "high" else "proceed"
+    }
 
 
 class WarrantyTools:
@@ -16,7 +99,7 @@ class WarrantyTools:
         receipt_data: Dict[str, Any] = None
     ) -> Dict[str, Any]:
         """Receive and log a new warranty claim."""
-        claim_id = f"CLM-{random.randint(10000, 99999)}"
+        claim_id = next_id("CLM")
         
         return {
             "tool": "receive_claim",
@@ -39,7 +122,7 @@ class WarrantyTools:
             "product_name": "Smart Air Purifier",
             "price": "$299.99",
             "payment_method": "Credit Card",
-            "transaction_id": f"TXN-{random.randint(100000, 999999)}"
+            "transaction_id": random_ref("TXN")
         }
         
         return {
@@ -53,19 +136,7 @@ class WarrantyTools:
     @staticmethod
     def verify_warranty(serial_number: str) -> Dict[str, Any]:
         """Verify warranty status for a product."""
-        warranty_info = MockDataStore.check_warranty(serial_number)
-        
-        return {
-            "tool": "verify_warranty",
-            "status": "success",
-            "serial_number": serial_number,
-            "warranty_valid": warranty_info.get("valid", False),
-            "product": warranty_info.get("product", "Unknown"),
-            "purchase_date": warranty_info.get("purchase_date"),
-            "warranty_end": warranty_info.get("warranty_end"),
-            "previous_claims": warranty_info.get("previous_claims", 0),
-            "coverage_type": "Full replacement" if warranty_info.get("valid") else "None"
-        }
+        return _verify_warranty(serial_number, date.today(), MockDataStore.version)
     
     @staticmethod
     def check_fraud_indicators(
@@ -75,58 +146,7 @@ class WarrantyTools:
         claim_date: str = None
     ) -> Dict[str, Any]:
         """Check for fraud indicators in the claim."""
-        fraud_flags = []
-        risk_score = 0
-        
-        # Check for multiple claims
-        if claim_history > 0:
-            fraud_flags.append({
-                "indicator": "Previous claims exist",
-                "severity": "medium",
-                "details": f"{claim_history} previous claim(s) on this serial number"
-            })
-            risk_score += 30
-        
-        if claim_history > 2:
-            fraud_flags.append({
-                "indicator": "Excessive claims",
-                "severity": "high",
-                "details": "More than 2 claims on same product"
-            })
-            risk_score += 40
-        
-        # Check if claim is very soon after purchase
-        if purchase_date:
-            try:
-                purchase = datetime.strptime(purchase_date, "%Y-%m-%d")
-                days_since_purchase = (datetime.now() - purchase).days
-                if days_since_purchase < 7:
-                    fraud_flags.append({
-                        "indicator": "Claim too soon after purchase",
-                        "severity": "medium",
-                        "details": f"Claimed within {days_since_purchase} days of purchase"
-                    })
-                    risk_score += 20
-            except:
-                pass
-        
-        # Determine risk level
-        if risk_score >= 70:
-            risk_level = "high"
-        elif risk_score >= 30:
-            risk_level = "medium"
-        else:
-            risk_level = "low"
-        
-        return {
-            "tool": "check_fraud_indicators",
-            "status": "success",
-            "serial_number": serial_number,
-            "fraud_flags": fraud_flags,
-            "risk_score": risk_score,
-            "risk_level": risk_level,
-            "recommendation": "manual_review" if risk_level == "high" else "proceed"
-        }
+        return _check_fraud_indicators(serial_number, claim_history, purchase_date, date.today())
     
     @staticmethod
     def make_decision(
@@ -162,7 +182,7 @@ class WarrantyTools:
             "reason": reason,
             "action": action,
             "decided_at": datetime.now().isoformat(),
-            "reference_number": f"REF-{random.randint(100000, 999999)}"
+            "reference_number": random_ref("REF")
         }
     
     @staticmethod
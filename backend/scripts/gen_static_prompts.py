@@ -0,0 +1,51 @@
+"""Generate app/data/_static_prompts.py from MockDataStore.
+
+The trend and supplier prompt sections are rendered from static mock data,
+so they are pre-rendered here once instead of being rebuilt on every request.
+Re-run after editing the mock data:
+
+    cd backend && python scripts/gen_static_prompts.py
+"""
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.data.mock_data import MockDataStore  # noqa: E402
+
+OUTPUT_PATH = os.path.join(BACKEND_DIR, "app", "data", "_static_prompts.py")
+
+
+def render_trends_context() -> str:
+    """Render current trends as prompt context."""
+    lines = []
+    for trend in MockDataStore.get_trending_items():
+        lines.append(f"- {trend['trend']}: {trend['mentions']:,} mentions ({trend['growth']}) on {trend['platform']} - {trend['sentiment']} sentiment")
+    return "\n".join(lines)
+
+
+def render_suppliers_context() -> str:
+    """Render supplier info as prompt context."""
+    lines = []
+    for category, suppliers in MockDataStore.SUPPLIERS.items():
+        for s in suppliers:
+            lines.append(f"- {s['name']} ({category}): {', '.join(s['products'])}")
+    return "\n".join(lines)
+
+
+def main():
+    content = (
+        '"""Pre-rendered prompt sections generated from MockDataStore.\n\n'
+        "DO NOT EDIT - regenerate with `python scripts/gen_static_prompts.py`.\n"
+        '"""\n\n'
+        f"TRENDS_CONTEXT = {render_trends_context()!r}\n\n"
+        f"SUPPLIERS_CONTEXT = {render_suppliers_context()!r}\n"
+    )
+    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
+        f.write(content)
+    print(f"Wrote {OUTPUT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
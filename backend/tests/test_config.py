@@ -0,0 +1,29 @@
+"""Settings are loaded on first use, not at import."""
+import subprocess
+import sys
+from pathlib import Path
+
+from app.api import routes
+from app.config import get_settings
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def test_importing_the_app_does_not_load_settings():
+    script = (
+        "import app.config as config\n"
+        "import app.main\n"
+        "assert config.get_settings.cache_info().currsize == 0\n"
+    )
+    subprocess.run([sys.executable, "-c", script], cwd=BACKEND_DIR, check=True)
+
+
+def test_stream_limit_follows_reloaded_settings(monkeypatch):
+    monkeypatch.setenv("MAX_CONCURRENT_STREAMS", "3")
+    get_settings.cache_clear()
+    assert routes._stream_semaphore()._value == 3
+
+    monkeypatch.setenv("MAX_CONCURRENT_STREAMS", "5")
+    get_settings.cache_clear()
+    assert routes._stream_semaphore()._value == 5
+    get_settings.cache_clear()
@@ -0,0 +1,24 @@
+"""Tool record IDs and pick-list bins."""
+from app.tools import ids
+from app.tools.fulfillment_tools import FulfillmentTools
+
+
+def test_next_id_is_unique_and_never_wraps(monkeypatch):
+    monkeypatch.setattr(ids, "_counter", iter([0xFFFFFF, 0x1000000]))
+    first, second = ids.next_id("ORD"), ids.next_id("ORD")
+
+    assert first == "ORD-FFFFFF"
+    assert second == "ORD-1000000"
+
+
+def test_pick_list_bins_restart_for_each_list():
+    allocations = [
+        {"warehouse_id": "WH-1", "sku": "SKU001", "quantity": 1, "zone": "A1"},
+        {"warehouse_id": "WH-1", "sku": "SKU002", "quantity": 1, "zone": "A1"},
+    ]
+    first = FulfillmentTools.generate_pick_list(allocations)
+    second = FulfillmentTools.generate_pick_list(allocations)
+
+    assert first["warehouses"] == second["warehouses"]
+    bins = [item["bin_location"] for item in first["warehouses"]["WH-1"]["items"]]
+    assert bins == ["A1-01", "A1-02"]
@@ -0,0 +1,12 @@
+"""Only side-effect-free agents are answered from the /chat response cache."""
+from app.api import routes
+
+
+def test_agents_with_side_effects_are_not_cached():
+    for agent_id in ("automotive_sales", "sales_trainer", "warranty_claims",
+                     "order_fulfillment", "expense_claim", "taxi_receipt"):
+        assert agent_id not in routes._CACHEABLE_AGENTS
+
+
+def test_cacheable_agents_exist():
+    assert routes._CACHEABLE_AGENTS <= routes._AGENT_FACTORIES.keys()
@@ -0,0 +1,52 @@
+"""Concurrent identical calls share one upstream call."""
+import asyncio
+import gc
+
+from app.services.single_flight import request_key, share_call
+
+
+def test_request_key_ignores_dict_order():
+    assert request_key({"a": 1, "b": 2}) == request_key({"b": 2, "a": 1})
+    assert request_key("x") != request_key("y")
+
+
+def test_concurrent_callers_share_one_call():
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    async def main():
+        inflight = {}
+        results = await asyncio.gather(*(share_call(inflight, b"k", upstream) for _ in range(3)))
+        return results, inflight
+
+    results, inflight = asyncio.run(main())
+    assert results == ["answer"] * 3
+    assert calls == [1]
+    assert inflight == {}
+
+
+def test_abandoned_failure_is_not_reported_as_unretrieved():
+    unretrieved = []
+
+    async def upstream():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        loop.set_exception_handler(lambda _, context: unretrieved.append(context))
+        inflight = {}
+        caller = asyncio.ensure_future(share_call(inflight, b"k", upstream))
+        await asyncio.sleep(0)
+        caller.cancel()
+        await asyncio.sleep(0.05)
+        del caller
+        gc.collect()
+        return inflight
+
+    assert asyncio.run(main()) == {}
+    assert unretrieved == []
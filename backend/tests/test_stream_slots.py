@@ -0,0 +1,53 @@
+"""Stream slots held by the bounded SSE endpoints are always returned."""
+import asyncio
+
+from app.api import routes
+
+
+async def _frames():
+    yield b"data: {}\n\n"
+
+
+def _scope():
+    return {"type": "http", "method": "POST", "path": "/", "headers": []}
+
+
+async def _receive():
+    await asyncio.sleep(3600)
+    return {"type": "http.disconnect"}
+
+
+def test_slot_released_after_stream_completes():
+    async def main():
+        free = routes._stream_semaphore()._value
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        response = await routes._bounded_event_stream(_frames())
+        assert routes._stream_semaphore()._value == free - 1
+        await response(_scope(), _receive, send)
+        return free, sent
+
+    free, sent = asyncio.run(main())
+    assert routes._stream_semaphore()._value == free
+    assert sent[0]["type"] == "http.response.start"
+
+
+def test_slot_released_when_response_fails_before_streaming():
+    async def main():
+        free = routes._stream_semaphore()._value
+
+        async def send(message):
+            raise OSError("client went away")
+
+        response = await routes._bounded_event_stream(_frames())
+        try:
+            await response(_scope(), _receive, send)
+        except Exception:
+            pass
+        return free
+
+    free = asyncio.run(main())
+    assert routes._stream_semaphore()._value == free
@@ -0,0 +1,106 @@
+"""VisionService.analyze_images_batch deadlines and fallback."""
+import asyncio
+
+import pytest
+
+from app.config import get_settings
+from app.services.vision_batcher import AsyncBatchQueue
+from app.services.vision_service import VisionService
+
+
+class _Reply:
+    def __init__(self, content):
+        self.content = content
+
+
+class _HangingLLM:
+    """A model whose calls never return, like a stuck upstream connection."""
+
+    async def abatch(self, inputs, return_exceptions=False):
+        await asyncio.sleep(3600)
+
+    async def ainvoke(self, messages):
+        await asyncio.sleep(3600)
+
+
+class _EchoLLM:
+    def __init__(self):
+        self.batches = []
+
+    async def abatch(self, inputs, return_exceptions=False):
+        self.batches.append(len(inputs))
+        return [_Reply(messages[0].content[1]["text"]) for messages in inputs]
+
+    async def ainvoke(self, messages):
+        return _Reply("fallback: " + messages[0].content[1]["text"])
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    get_settings.cache_clear()
+    service = VisionService()
+    service.hedge_delay = 0.01
+    service.call_timeout = 0.1
+    yield service
+    get_settings.cache_clear()
+
+
+def test_stuck_batch_settles_every_caller_with_timeout(service):
+    service.llm = _HangingLLM()
+    service.fallback_llm = _HangingLLM()
+    queue = AsyncBatchQueue(service.analyze_images_batch, max_batch_size=8, max_wait_time=0.01)
+
+    async def main():
+        return await asyncio.wait_for(
+            asyncio.gather(
+                *(queue.add_request(f"aW1n{i}", "read receipt") for i in range(3)),
+                return_exceptions=True
+            ),
+            timeout=5
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, asyncio.TimeoutError) for r in results)
+
+
+def test_timed_out_batch_falls_back_per_item(service):
+    service.llm = _HangingLLM()
+    service.fallback_llm = _EchoLLM()
+
+    results = asyncio.run(service.analyze_images_batch([("aW1nMQ==", "one"), ("aW1nMg==", "two")]))
+
+    assert results == ["fallback: one", "fallback: two"]
+
+
+def test_batch_uses_cache_and_dedupes_repeats(service):
+    service.llm = _EchoLLM()
+    service.fallback_llm = _HangingLLM()
+
+    first = asyncio.run(service.analyze_images_batch(
+        [("aW1nMQ==", "one"), ("aW1nMQ==", "one"), ("aW1nMg==", "two")]
+    ))
+    # Cached answers are served to both entry points without a model call
+    second = asyncio.run(service.analyze_images_batch([("aW1nMQ==", "one")]))
+    single = asyncio.run(service.analyze_image("aW1nMg==", "two"))
+
+    assert first == ["one", "one", "two"]
+    assert second == ["one"]
+    assert single == "two"
+    assert service.llm.batches == [2]
+
+
+def test_batch_joins_a_call_already_in_flight(service):
+    service.llm = _EchoLLM()
+
+    async def main():
+        async def in_flight_call():
+            await asyncio.sleep(0.01)
+            return "from analyze_image"
+
+        key = service._cache_key("aW1nMQ==", "one", "image/jpeg")
+        service._inflight[key] = asyncio.ensure_future(in_flight_call())
+        return await service.analyze_images_batch([("aW1nMQ==", "one")])
+
+    assert asyncio.run(main()) == ["from analyze_image"]
+    assert service.llm.batches == []
@@ -0,0 +1,57 @@
+"""AsyncBatchQueue grouping and failure handling."""
+import asyncio
+
+from app.services.vision_batcher import AsyncBatchQueue
+
+
+def run_requests(queue, count):
+    async def main():
+        return await asyncio.gather(
+            *(queue.add_request(f"image-{i}", "prompt") for i in range(count)),
+            return_exceptions=True
+        )
+    return asyncio.run(main())
+
+
+def test_concurrent_requests_share_a_batch():
+    batches = []
+
+    async def process(items):
+        batches.append(len(items))
+        return [image for image, _ in items]
+
+    results = run_requests(AsyncBatchQueue(process, max_batch_size=8, max_wait_time=0.05), 5)
+
+    assert results == [f"image-{i}" for i in range(5)]
+    assert batches == [5]
+
+
+def test_batches_are_capped_at_max_size():
+    batches = []
+
+    async def process(items):
+        batches.append(len(items))
+        return [image for image, _ in items]
+
+    results = run_requests(AsyncBatchQueue(process, max_batch_size=2, max_wait_time=0.05), 5)
+
+    assert results == [f"image-{i}" for i in range(5)]
+    assert sum(batches) == 5 and max(batches) == 2
+
+
+def test_short_result_list_fails_every_caller():
+    async def process(items):
+        return ["only one"]
+
+    results = run_requests(AsyncBatchQueue(process), 3)
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_batch_error_fails_every_caller():
+    async def process(items):
+        raise ValueError("upstream down")
+
+    results = run_requests(AsyncBatchQueue(process), 3)
+
+    assert all(isinstance(r, ValueError) for r in results)
@@ -0,0 +1,56 @@
+"""VisionService.astream_image fallback and deadline."""
+import asyncio
+
+import pytest
+
+from app.config import get_settings
+from app.services.vision_service import VisionService
+
+
+class _Chunk:
+    def __init__(self, content):
+        self.content = content
+
+
+class _FakeLLM:
+    def __init__(self, chunks, delay=0.0, fail=False):
+        self.chunks, self.delay, self.fail = chunks, delay, fail
+
+    async def astream(self, messages):
+        if self.fail:
+            raise RuntimeError("primary down")
+        for text in self.chunks:
+            await asyncio.sleep(self.delay)
+            yield _Chunk(text)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    get_settings.cache_clear()
+    yield VisionService()
+    get_settings.cache_clear()
+
+
+def collect(service, prompt):
+    async def main():
+        return [text async for text in service.astream_image("aW1hZ2U=", prompt)]
+    return asyncio.run(main())
+
+
+def test_stream_falls_back_before_first_chunk(service):
+    service.llm = _FakeLLM([], fail=True)
+    service.fallback_llm = _FakeLLM(["a ", "scratch"])
+
+    assert collect(service, "describe") == ["a ", "scratch"]
+    # The finished answer is cached and replayed in one chunk
+    service.fallback_llm = _FakeLLM([], fail=True)
+    assert collect(service, "describe") == ["a scratch"]
+
+
+def test_stalled_stream_hits_the_overall_deadline(service):
+    service.call_timeout = 0.1
+    service.llm = _FakeLLM(["slow"] * 10, delay=0.05)
+
+    with pytest.raises(asyncio.TimeoutError):
+        collect(service, "describe slowly")
@@ -0,0 +1,24 @@
+"""Voice analytics query routing."""
+from app.agents import voice_analytics_agent as va
+
+
+def topic(text):
+    return va._find_topic(text.lower())
+
+
+def test_inflected_topics_match():
+    assert topic("Show me the returns") == "return"
+    assert topic("Any cancelled subscriptions?") == "cancel"
+    assert topic("billing inquiries") == "billing"
+
+
+def test_topics_follow_priority_order():
+    assert topic("billing calls about a return") == "return"
+
+
+def test_keywords_must_start_a_word():
+    assert topic("nonreturnable item") is None
+
+
+def test_dashboard_matches_plural():
+    assert va._DASHBOARD_RE.search("show dashboards") is not None
@@ -1,5 +1,17 @@
 const API_BASE = '/api'
 
+/**
+ * Merge a workflow_step event into the accumulated step list.
+ * Incremental events carry `step` + `index`; legacy events carry `all_steps`.
+ */
+function applyStepEvent(steps, parsed) {
+  if (parsed.all_steps) return parsed.all_steps
+  if (parsed.index === undefined) return [parsed.step]
+  const next = [...steps]
+  next[parsed.index] = parsed.step
+  return next
+}
+
 export async function fetchAgents() {
   const response = await fetch(`${API_BASE}/agents`)
   if (!response.ok) throw new Error('Failed to fetch agents')
@@ -122,6 +134,8 @@ export async function sendMessageWithImageStream(agentId, message, imageFile, on
   const reader = response.body.getReader()
   const decoder = new TextDecoder()
   let buffer = ''
+  let steps = []
+  let streamed = ''
   
   while (true) {
     const { done, value } = await reader.read()
@@ -141,7 +155,14 @@ export async function sendMessageWithImageStream(agentId, message, imageFile, on
         try {
           const parsed = JSON.parse(data)
           if (parsed.type === 'workflow_step') {
-            onStepUpdate(parsed.all_steps || [parsed.step])
+            steps = applyStepEvent(steps, parsed)
+            onStepUpdate(steps)
+          } else if (parsed.type === 'token' || parsed.type === 'response_chunk') {
+            // Partial output (LLM tokens or response sections) - render progressively
+            streamed += parsed.content
+            onResponse(streamed)
+          } else if (parsed.type === 'response_end') {
+            if (parsed.all_steps) onStepUpdate(parsed.all_steps)
           } else if (parsed.type === 'response') {
             onResponse(parsed.content)
           } else if (parsed.type === 'error') {
@@ -186,6 +207,8 @@ export async function sendMessageWithWorkflowStream(agentId, message, context =
   const reader = response.body.getReader()
   const decoder = new TextDecoder()
   let buffer = ''
+  let steps = []
+  let streamed = ''
   
   while (true) {
     const { done, value } = await reader.read()
@@ -206,8 +229,15 @@ export async function sendMessageWithWorkflowStream(agentId, message, context =
         try {
           const parsed = JSON.parse(data)
           if (parsed.type === 'workflow_step') {
-            // Send all steps to update the UI
-            onStepUpdate(parsed.all_steps || [parsed.step])
+            // Accumulate steps and send the full list to update the UI
+            steps = applyStepEvent(steps, parsed)
+            onStepUpdate(steps)
+          } else if (parsed.type === 'token' || parsed.type === 'response_chunk') {
+            // Partial output (LLM tokens or response sections) - render progressively
+            streamed += parsed.content
+            onResponse(streamed)
+          } else if (parsed.type === 'response_end') {
+            if (parsed.all_steps) onStepUpdate(parsed.all_steps)
           } else if (parsed.type === 'response') {
             onResponse(parsed.content)
           } else if (parsed.type === 'error') {
@@ -302,6 +332,7 @@ export async function submitApprovalAndContinue(approvalId, approved, onStepUpda
   const reader = response.body.getReader()
   const decoder = new TextDecoder()
   let buffer = ''
+  let steps = []
   
   while (true) {
     const { done, value } = await reader.read()
@@ -321,7 +352,8 @@ export async function submitApprovalAndContinue(approvalId, approved, onStepUpda
         try {
           const parsed = JSON.parse(data)
           if (parsed.type === 'workflow_step') {
-            onStepUpdate(parsed.all_steps || [parsed.step])
+            steps = applyStepEvent(steps, parsed)
+            onStepUpdate(steps)
           } else if (parsed.type === 'response') {
             onResponse(parsed.content)
           } else if (parsed.type === 'error') {